@@ -3,6 +3,13 @@ from sat_sat3 import *
 from sat_subsetsum import *
 from subsetsum import *
 from sat import solve_sat_bruteforce
+from sat_preprocess import solve_sat_preprocessed
+from sat_cdcl import CDCLSolver
+from sat_count import count_models
+from subsetsum_count import count_solutions, sample_solutions
+
+MAX_LISTED_SOLUTIONS = 100
+
 def main():
     print("==== SAT Tools ====")
     print("1: SAT Solver and verifier")
@@ -13,7 +20,7 @@ def main():
 
     if choice == "1":
         variables, clauses = 5, [[1,2,4,-7],[2,-3],[-4,-5]]
-        solution = solve_sat_bruteforce(clauses,variables)
+        solution = solve_sat_preprocessed(clauses,variables)
         if solution is False:
             print("UNSAT")
         else :
@@ -30,16 +37,20 @@ def main():
         print(f"Instance: {instance_name}")
         print(f"Numbers ({len(nums)}): {nums}")
         print(f"Target: {target}")
-        solutions = subsets(nums, target)
-        print(f"\nTotal backtracking solutions found: {len(solutions)}")
-        print("\nBacktracking solutions in 0/1 format:")
-        for subset in solutions:
-            binary = subset_to_binary(nums, subset)
-            print(binary)
-        dp_solution = dp_subset_sum_one(nums, target)
-        if dp_solution:
-            print("\nDP found one solution (values):", dp_solution)
-            print("DP solution in 0/1 format:", subset_to_binary(nums, dp_solution))
+        total = count_solutions(nums, target)
+        print(f"\nTotal solutions (counted by DP): {total}")
+        if total <= MAX_LISTED_SOLUTIONS:
+            solutions = list(iter_subsets(nums, target))
+            print("\nBacktracking solutions in 0/1 format:")
+        else:
+            solutions = sample_solutions(nums, target, MAX_LISTED_SOLUTIONS)
+            print(f"\n{MAX_LISTED_SOLUTIONS} uniformly sampled solutions in 0/1 format:")
+        for mask in solutions:
+            print(mask_to_binary(mask, len(nums)))
+        dp_mask = dp_subset_sum_mask(nums, target)
+        if dp_mask:
+            print("\nDP found one solution (values):", mask_to_subset(nums, dp_mask))
+            print("DP solution in 0/1 format:", mask_to_binary(dp_mask, len(nums)))
         else:
             print("\nDP found no solution.")
        
@@ -54,12 +65,28 @@ def main():
 
         print(f"Original variables: {original_variables}, Total variables after reduction: {new_variables}")
         print(f"Original clauses: {len(original_clauses)}, Total clauses after reduction: {len(new_clauses)}")
-        solution = solve_sat_bruteforce(new_clauses,new_variables)
-        ver = verify_projection_preserves_satisfiability(original_clauses,new_clauses,solution,original_variables)
+        solver = CDCLSolver(new_variables)
+        for clause in new_clauses:
+            solver.add_clause(clause)
+        solution = solver.model() if solver.solve() else None
+        ver = solution is not None and verify_projection_preserves_satisfiability(
+            original_clauses, new_clauses, solution, original_variables)
         if ver:
             print("SAT preserved")
         else:
             print("SAT unpreserved")
+        # reverse direction, reusing the solver: every model of the original
+        # formula must extend to a model of the reduced one
+        original = CDCLSolver(original_variables)
+        for clause in original_clauses:
+            original.add_clause(clause)
+        variables = range(1, original_variables + 1)
+        extendable = all(solver.solve([v if model[v] else -v for v in variables])
+                         for model in original.iter_models())
+        print("Every original model extends:", extendable)
+        print("Models (original / reduced, projected):",
+              count_models(original_clauses, original_variables),
+              count_models(new_clauses, new_variables, range(1, original_variables + 1)))
 
     elif choice == "4":
         clauses = [[1,3],[1,-2],[2,3,4,5]]
@@ -68,8 +95,9 @@ def main():
 
         # Example satisfying assignment
         assignment = {1: False, 2: False, 3: True, 4: False, 5: False}
-        subset = sat_solution_to_subset(assignment, numbers, meta, clauses)
-        binary_solution = subset_to_binary_solution(subset, numbers)
+        mask = sat_solution_to_mask(assignment, meta, clauses)
+        subset = mask_to_subset(numbers, mask)
+        binary_solution = mask_to_binary(mask, len(numbers))
 
         write_subsetsum_instance(
             prefix="p09",
@@ -0,0 +1,321 @@
+"""
+Batch command line: solve, reduce and verify whole directories of instances
+
+    python -m batch solve-sat 'cnf/**/*.cnf' [--solver auto]
+    python -m batch solve-subsetsum 'subsetsum_datasets/*_w.txt' [--solver auto]
+    python -m batch reduce-3sat 'cnf/*.cnf' --out-dir reduced_3sat [--optimized]
+    python -m batch reduce-subsetsum 'cnf/*.cnf' --out-dir reduced_subsetsum
+    python -m batch verify results.jsonl
+
+Common options: --workers N, --timeout SECONDS, --memory MIB and
+--output FILE (JSON lines, default stdout). Inputs are glob patterns of
+DIMACS files (plain, .gz or .xz) or of SUBSETSUM _w/_c/_s files (one
+instance per prefix, _s optional). verify re-reads the instance of every
+solve-* result line and checks its solution.
+
+Each instance is one task of a process pool and gets one JSON line when it
+finishes, with its status (sat, unsat, done, ok, wrong, skipped, timeout,
+memout or error) and elapsed time. The timeout is a SIGALRM timer and the
+memory limit an RLIMIT_AS on the worker process, both where the platform
+has them; a solver stuck in one long C call only sees the timer once the
+call returns. Only the standard library is imported here: the solver
+modules are imported by the workers.
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import re
+import signal
+import sys
+import time
+from collections import Counter
+
+try:
+    import resource
+except ImportError:  # no memory limit on platforms without it
+    resource = None
+
+DEFAULT_TIMEOUT = 60.0   # seconds per instance, 0 for none
+DEFAULT_MEMORY = 0       # MiB of address space per worker, 0 for no limit
+
+# names of portfolio.SAT_ENGINES / SUBSETSUM_ENGINES, "auto" picks the one
+# with the lowest estimated cost (portfolio is not imported here)
+SAT_SOLVERS = ("auto", "cdcl", "preprocessed", "bruteforce_vectorized")
+SUBSETSUM_SOLVERS = ("auto", "dp", "mitm", "digits", "backtracking")
+
+_SUBSETSUM_FILE = re.compile(r"_[wcs]\.txt$")
+_HAS_ALARM = hasattr(signal, "SIGALRM")
+
+
+class _Timeout(Exception):
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise _Timeout()
+
+
+# ---- instances ----
+
+def expand_inputs(patterns, subsetsum=False):
+    """
+    Files matching the glob patterns, sorted, without duplicates. With
+    subsetsum=True, instance prefixes ("dir/p01") of _w/_c/_s files.
+    """
+    found = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True))
+        if not matches and os.path.exists(pattern):
+            matches = [pattern]
+        if not matches:
+            print(f"warning: no file matches {pattern!r}", file=sys.stderr)
+        found += [path for path in matches if os.path.isfile(path)]
+    if subsetsum:
+        found = [_SUBSETSUM_FILE.sub("", path) for path in found
+                 if _SUBSETSUM_FILE.search(path)]
+    return list(dict.fromkeys(found))
+
+
+def _stem(path):
+    name = os.path.basename(path)
+    for ext in (".gz", ".xz", ".cnf", ".dimacs"):
+        if name.endswith(ext):
+            name = name[:-len(ext)]
+    return name
+
+
+def _read_cnf(path):
+    from read_write_files import iter_dimacs_clauses, read_dimacs_header
+    header = read_dimacs_header(path)
+    clauses = list(iter_dimacs_clauses(path))
+    if header is not None:
+        return header[0], clauses
+    return max((abs(lit) for clause in clauses for lit in clause), default=0), clauses
+
+
+def _read_subsetsum(prefix):
+    from read_write_files import parse_instance_texts
+    texts = []
+    for suffix in ("w", "c", "s"):
+        path = f"{prefix}_{suffix}.txt"
+        if suffix == "s" and not os.path.exists(path):
+            texts.append("")
+            continue
+        with open(path) as f:
+            texts.append(f.read())
+    return parse_instance_texts(*texts)
+
+
+# ---- tasks (run in the workers) ----
+
+def _solve_sat(path, options):
+    from portfolio import SAT_ENGINES, sat_costs, sat_features
+    from sat import verify_sat
+    from solver_stats import SolverStats
+
+    num_vars, clauses = _read_cnf(path)
+    solver = options["solver"]
+    if solver == "auto":
+        costs = sat_costs(sat_features(clauses, num_vars))
+        solver = min(costs, key=costs.get)
+    with SolverStats() as stats:
+        model = SAT_ENGINES[solver](clauses, num_vars)
+    record = {"solver": solver, "num_vars": num_vars, "num_clauses": len(clauses)}
+    if model is None:
+        record["status"] = "unsat"
+    else:
+        record.update(status="sat", verified=verify_sat(clauses, model),
+                      model=[var if model[var] else -var for var in sorted(model)])
+    record["stats"] = stats.as_dict()
+    return record
+
+
+def _solve_subsetsum(prefix, options):
+    from portfolio import SUBSETSUM_ENGINES, subsetsum_costs, subsetsum_features
+    from solver_stats import SolverStats
+    from subsetsum import mask_to_bitstring, mask_to_subset
+
+    nums, target, _ = _read_subsetsum(prefix)
+    solver = options["solver"]
+    if solver == "auto":
+        costs = subsetsum_costs(subsetsum_features(nums, target))
+        solver = min(costs, key=costs.get)
+    with SolverStats() as stats:
+        mask = SUBSETSUM_ENGINES[solver](nums, target)
+    record = {"solver": solver, "n": len(nums)}
+    if mask is None:
+        record["status"] = "unsat"
+    else:
+        record.update(status="sat", verified=sum(mask_to_subset(nums, mask)) == target,
+                      solution=mask_to_bitstring(mask, len(nums)))
+    record["stats"] = stats.as_dict()
+    return record
+
+
+def _reduce_3sat(path, options):
+    output = os.path.join(options["out_dir"], _stem(path) + "_3sat.cnf")
+    if options["optimized"]:
+        from read_write_files import write_dimacs
+        from sat_sat3 import sat_3sat_optimized
+        num_vars, clauses = _read_cnf(path)
+        total_vars, reduced, meta = sat_3sat_optimized(clauses, num_vars)
+        write_dimacs(output, total_vars, reduced)
+        return {"status": "done", "output": output, "num_vars": total_vars,
+                "num_clauses": len(reduced), "fixed": len(meta["fixed"])}
+    from sat_sat3 import sat_3sat_file
+    total_vars, num_clauses = sat_3sat_file(path, output)
+    return {"status": "done", "output": output, "num_vars": total_vars,
+            "num_clauses": num_clauses}
+
+
+def _reduce_subsetsum(path, options):
+    from read_write_files import write_subsetsum_instance
+    from sat_subsetsum import sat_to_subsetsum_base2
+    num_vars, clauses = _read_cnf(path)
+    nums, target, _ = sat_to_subsetsum_base2(clauses, num_vars)
+    prefix = _stem(path)
+    write_subsetsum_instance(prefix, nums, target, directory=options["out_dir"])
+    return {"status": "done", "output": os.path.join(options["out_dir"], prefix),
+            "n": len(nums), "target_bits": target.bit_length()}
+
+
+def _verify(path, options):
+    """Check the solution of one solve-* result line against its instance."""
+    result = options["result"]
+    record = {"checked": result.get("command")}
+    if result.get("status") != "sat":
+        return dict(record, status="skipped", reason=f"status {result.get('status')}")
+    if result.get("command") == "solve-sat":
+        from sat import verify_sat
+        _, clauses = _read_cnf(path)
+        model = {abs(lit): lit > 0 for lit in result["model"]}
+        ok = verify_sat(clauses, model)
+    elif result.get("command") == "solve-subsetsum":
+        nums, target, _ = _read_subsetsum(path)
+        bits = result["solution"]
+        ok = len(bits) == len(nums) and \
+            sum(num for num, bit in zip(nums, bits) if bit == "1") == target
+    else:
+        return dict(record, status="skipped", reason="not a solve result")
+    return dict(record, status="ok" if ok else "wrong")
+
+
+COMMANDS = {
+    "solve-sat": _solve_sat,
+    "solve-subsetsum": _solve_subsetsum,
+    "reduce-3sat": _reduce_3sat,
+    "reduce-subsetsum": _reduce_subsetsum,
+    "verify": _verify,
+}
+
+
+# ---- process pool ----
+
+def _init_worker(memory):
+    if memory and resource is not None:
+        limit = memory << 20
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if _HAS_ALARM:
+        signal.signal(signal.SIGALRM, _on_alarm)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)   # Ctrl-C is handled by the parent
+
+
+def run_task(task):
+    """task = (command, path, options); returns the JSON record."""
+    command, path, options = task
+    record = {"command": command, "file": path}
+    timeout = options.get("timeout")
+    start = time.perf_counter()
+    try:
+        if timeout and _HAS_ALARM:
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        record.update(COMMANDS[command](path, options))
+    except _Timeout:
+        record["status"] = "timeout"
+    except MemoryError:
+        record["status"] = "memout"
+    except Exception as exc:
+        record.update(status="error", error=repr(exc))
+    finally:
+        if timeout and _HAS_ALARM:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    record["elapsed"] = time.perf_counter() - start
+    return record
+
+
+def run_tasks(tasks, workers=None, memory=DEFAULT_MEMORY):
+    """Yield the records of `tasks` as the pool finishes them."""
+    with multiprocessing.Pool(workers or os.cpu_count() or 1, _init_worker,
+                              (memory,)) as pool:
+        yield from pool.imap_unordered(run_task, tasks)
+
+
+def _verify_tasks(patterns, options):
+    tasks = []
+    for path in expand_inputs(patterns):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    result = json.loads(line)
+                    tasks.append(("verify", result["file"], dict(options, result=result)))
+    return tasks
+
+
+# ---- command line ----
+
+def main(argv=None):
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("inputs", nargs="+", help="glob patterns (quote them)")
+    common.add_argument("--workers", type=int, help="worker processes (default: all CPUs)")
+    common.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help="seconds per instance, 0 for none")
+    common.add_argument("--memory", type=int, default=DEFAULT_MEMORY,
+                        help="MiB of address space per worker, 0 for no limit")
+    common.add_argument("--output", help="JSON lines file (default: stdout)")
+
+    parser = argparse.ArgumentParser(prog="python -m batch")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("solve-sat", parents=[common]) \
+        .add_argument("--solver", choices=SAT_SOLVERS, default="auto")
+    commands.add_parser("solve-subsetsum", parents=[common]) \
+        .add_argument("--solver", choices=SUBSETSUM_SOLVERS, default="auto")
+    reduce_3sat = commands.add_parser("reduce-3sat", parents=[common])
+    reduce_3sat.add_argument("--out-dir", default="reduced_3sat")
+    reduce_3sat.add_argument("--optimized", action="store_true",
+                             help="use sat_3sat_optimized (smaller output)")
+    commands.add_parser("reduce-subsetsum", parents=[common]) \
+        .add_argument("--out-dir", default="reduced_subsetsum")
+    commands.add_parser("verify", parents=[common])
+    args = parser.parse_args(argv)
+
+    options = {"timeout": args.timeout}
+    for name in ("solver", "out_dir", "optimized"):
+        if hasattr(args, name):
+            options[name] = getattr(args, name)
+    if "out_dir" in options:
+        os.makedirs(options["out_dir"], exist_ok=True)
+    if args.command == "verify":
+        tasks = _verify_tasks(args.inputs, options)
+    else:
+        paths = expand_inputs(args.inputs, subsetsum=args.command == "solve-subsetsum")
+        tasks = [(args.command, path, options) for path in paths]
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    statuses = Counter()
+    try:
+        for record in run_tasks(tasks, args.workers, args.memory):
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            statuses[record["status"]] += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"{len(tasks)} task(s): " + ", ".join(f"{count} {status}" for status, count
+                                                in sorted(statuses.items())), file=sys.stderr)
+    return 1 if statuses["error"] or statuses["wrong"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""
+Benchmark suite for the SAT / SUBSETSUM solvers and reductions
+
+    python -m benchmarks bench [--filter TEXT] [--repeat N] [--warmup N]
+                               [--history FILE] [--csv FILE] [--save-baseline FILE]
+    python -m benchmarks check [--baseline FILE] [--tolerance 0.25]
+
+Every case is run `warmup` times, then timed `repeat` times with
+perf_counter, then run once more under tracemalloc for its peak memory,
+with a SolverStats active to record the search statistics.
+Inputs are the subsetsum_datasets instances p01-p06, seeded random CNFs and
+the outputs of the reductions; they are built before timing starts.
+`bench` appends one JSON line per run to the history file (and rows to a
+CSV file if asked); `check` runs the suite and compares it with a stored
+baseline, exiting with status 1 when a case got slower or bigger.
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from instance_store import default_store
+from sat import solve_sat_bruteforce, solve_sat_bruteforce_vectorized, verify_sat
+from sat_cdcl import solve_sat_cdcl
+from sat_preprocess import solve_sat_preprocessed
+from sat_sat3 import sat_3sat, sat_3sat_optimized
+from sat_subsetsum import sat_to_subsetsum_base2, sat_to_subsetsum_sparse
+from solver_stats import SolverStats
+from subsetsum import dp_subset_sum_mask, iter_subsets, mask_to_subset
+from subsetsum_count import count_solutions
+from subsetsum_digits import solve_digits
+from subsetsum_mitm import mitm_count, mitm_find_one
+from subsetsum_parallel import parallel_find_one
+
+HISTORY_FILE = "bench_history.jsonl"
+BASELINE_FILE = "bench_baseline.json"
+DATASETS = [f"p{i:02d}" for i in range(1, 7)]
+SEED = 2025
+
+WARMUP = 1
+REPEAT = 5
+TOLERANCE = 0.25             # check: allowed relative slowdown / growth
+MIN_TIME_DELTA = 1e-3        # check: ignore slowdowns below this (seconds)
+MIN_MEMORY_DELTA = 64 << 10  # check: ignore growth below this (bytes)
+
+
+class Case:
+    """One benchmark: func(*args), with an optional check(result) -> bool."""
+
+    def __init__(self, name, group, func, args, check=None):
+        self.name = name
+        self.group = group
+        self.func = func
+        self.args = args
+        self.check = check
+
+
+def random_cnf(num_vars, num_clauses, max_literals=3, min_literals=None, seed=SEED):
+    """Seeded random CNF, clause lengths uniform in [min_literals, max_literals]."""
+    rng = random.Random(seed)
+    low = max_literals if min_literals is None else min_literals
+    formula = []
+    for _ in range(num_clauses):
+        k = min(rng.randint(low, max_literals), num_vars)
+        formula.append([v if rng.random() < 0.5 else -v
+                        for v in rng.sample(range(1, num_vars + 1), k)])
+    return formula
+
+
+# ---- cases ----
+
+def _sat_check(formula):
+    return lambda model: model is None or verify_sat(formula, model)
+
+
+def _mask_check(nums, target):
+    return lambda mask: mask is None or sum(mask_to_subset(nums, mask)) == target
+
+
+def _count_all(nums, target):
+    return sum(1 for _ in iter_subsets(nums, target))
+
+
+def _sat_cases():
+    cases = []
+    small = random_cnf(14, 50)
+    for name, solver in (("bruteforce", solve_sat_bruteforce),
+                         ("bruteforce_vectorized", solve_sat_bruteforce_vectorized),
+                         ("cdcl", solve_sat_cdcl),
+                         ("preprocessed", solve_sat_preprocessed)):
+        cases.append(Case(f"sat/{name}/n14", "sat", solver, (small, 14), _sat_check(small)))
+    for n, m in ((75, 320), (150, 600)):
+        formula = random_cnf(n, m)
+        for name, solver in (("cdcl", solve_sat_cdcl), ("preprocessed", solve_sat_preprocessed)):
+            cases.append(Case(f"sat/{name}/n{n}", "sat", solver, (formula, n),
+                              _sat_check(formula)))
+    return cases
+
+
+def _reduction_cases():
+    cases = []
+    wide = random_cnf(300, 3000, max_literals=10, min_literals=1)
+    cases.append(Case("reduce/sat_3sat/n300", "reduction", sat_3sat, (wide, 301)))
+    cases.append(Case("reduce/sat_3sat_optimized/n300", "reduction", sat_3sat_optimized,
+                      (wide, 300)))
+    cnf3 = random_cnf(40, 170)
+    cases.append(Case("reduce/sat_to_subsetsum_base2/n40", "reduction",
+                      sat_to_subsetsum_base2, (cnf3, 40)))
+    cases.append(Case("reduce/sat_to_subsetsum_sparse/n40", "reduction",
+                      sat_to_subsetsum_sparse, (cnf3, 40)))
+
+    # solvers on reduction outputs
+    k_cnf = random_cnf(60, 250, max_literals=6, min_literals=1)
+    num_vars, reduced = sat_3sat(k_cnf, 61)
+    cases.append(Case("reduced/cdcl_on_3sat/n60", "reduced", solve_sat_cdcl,
+                      (reduced, num_vars), _sat_check(reduced)))
+    for n, m, name, solver in ((10, 30, "solve_digits", solve_digits),
+                               (4, 6, "mitm_find_one", mitm_find_one)):
+        nums, target, _ = sat_to_subsetsum_base2(random_cnf(n, m), n)
+        cases.append(Case(f"reduced/{name}_on_subsetsum/n{n}", "reduced", solver,
+                          (nums, target), _mask_check(nums, target)))
+    return cases
+
+
+def _dataset_cases():
+    cases = []
+    store = default_store()
+    for name in DATASETS:
+        nums, target, _ = store.load(name)
+        args = (nums, target)
+        expected = count_solutions(nums, target)
+        cases += [
+            Case(f"subsetsum/iter_subsets/{name}", "subsetsum", _count_all, args,
+                 lambda count, expected=expected: count == expected),
+            Case(f"subsetsum/dp_mask/{name}", "subsetsum", dp_subset_sum_mask, args,
+                 _mask_check(nums, target)),
+            Case(f"subsetsum/mitm_count/{name}", "subsetsum", mitm_count, args,
+                 lambda count, expected=expected: count == expected),
+            Case(f"subsetsum/count_solutions/{name}", "subsetsum", count_solutions, args),
+            Case(f"subsetsum/solve_digits/{name}", "subsetsum", solve_digits, args,
+                 _mask_check(nums, target)),
+            Case(f"subsetsum/parallel_find_one/{name}", "subsetsum", parallel_find_one,
+                 args + (2,), _mask_check(nums, target)),
+        ]
+    return cases
+
+
+def build_cases(pattern=None):
+    cases = _sat_cases() + _reduction_cases() + _dataset_cases()
+    if pattern:
+        cases = [case for case in cases if pattern in case.name]
+    return cases
+
+
+# ---- measurement ----
+
+def measure(case, warmup=WARMUP, repeat=REPEAT):
+    for _ in range(warmup):
+        case.func(*case.args)
+    times = []
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        result = case.func(*case.args)
+        times.append(time.perf_counter() - start)
+    # separate run: tracemalloc (and the statistics) slow the code down
+    tracemalloc.start()
+    try:
+        with SolverStats() as stats:
+            case.func(*case.args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "name": case.name,
+        "group": case.group,
+        "median": statistics.median(times),
+        "min": min(times),
+        "mean": statistics.fmean(times),
+        "repeat": len(times),
+        "peak_bytes": peak,
+        "ok": case.check(result) if case.check else None,
+        "stats": stats.as_dict(),
+    }
+
+
+def _stats_line(stats):
+    parts = [f"{name}={value}" for name, value in stats.items()
+             if value and name in STATS_FIELDS]
+    parts += [f"pruned[{reason}]={count}" for reason, count in sorted(stats["prunes"].items())]
+    return " ".join(parts)
+
+
+def run_suite(pattern=None, warmup=WARMUP, repeat=REPEAT, out=sys.stdout):
+    results = []
+    for case in build_cases(pattern):
+        record = measure(case, warmup, repeat)
+        results.append(record)
+        flag = "" if record["ok"] is not False else "  WRONG RESULT"
+        print(f"{record['name']:<45} {record['median'] * 1e3:10.2f} ms "
+              f"{record['peak_bytes'] / 1024:10.1f} KiB{flag}  {_stats_line(record['stats'])}",
+              file=out)
+    return results
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_metadata():
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+    }
+
+
+# ---- history / baseline ----
+
+STATS_FIELDS = ["nodes", "propagations", "conflicts", "dp_cells", "peak_table_bytes"]
+CSV_FIELDS = ["timestamp", "commit", "name", "group", "median", "min", "mean",
+              "repeat", "peak_bytes", "ok"] + STATS_FIELDS
+
+
+def append_history(path, meta, results):
+    with open(path, "a") as f:
+        f.write(json.dumps(dict(meta, results=results)) + "\n")
+
+
+def append_csv(path, meta, results):
+    new = not os.path.exists(path) or os.path.getsize(path) == 0
+    with open(path, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        if new:
+            writer.writeheader()
+        for record in results:
+            row = dict(meta, **record, **record.get("stats", {}))
+            writer.writerow({field: row.get(field) for field in CSV_FIELDS})
+
+
+def save_baseline(path, meta, results):
+    with open(path, "w") as f:
+        json.dump(dict(meta, results={r["name"]: r for r in results}), f, indent=1)
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """(name, what, baseline value, current value) for every regression."""
+    regressions = []
+    for record in results:
+        old = baseline.get(record["name"])
+        if record["ok"] is False:
+            regressions.append((record["name"], "result", True, False))
+        if old is None:
+            continue
+        if record["median"] > old["median"] * (1 + tolerance) \
+                and record["median"] - old["median"] > MIN_TIME_DELTA:
+            regressions.append((record["name"], "time", old["median"], record["median"]))
+        if record["peak_bytes"] > old["peak_bytes"] * (1 + tolerance) \
+                and record["peak_bytes"] - old["peak_bytes"] > MIN_MEMORY_DELTA:
+            regressions.append((record["name"], "memory", old["peak_bytes"],
+                                record["peak_bytes"]))
+    return regressions
+
+
+# ---- command line ----
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for command in ("bench", "check"):
+        sub = commands.add_parser(command)
+        sub.add_argument("--filter", help="only cases whose name contains this text")
+        sub.add_argument("--warmup", type=int, default=WARMUP)
+        sub.add_argument("--repeat", type=int, default=REPEAT)
+    bench = commands.choices["bench"]
+    bench.add_argument("--history", default=HISTORY_FILE, help="JSON lines history file")
+    bench.add_argument("--csv", help="also append the results to this CSV file")
+    bench.add_argument("--save-baseline", metavar="FILE", help="store this run as baseline")
+    check = commands.choices["check"]
+    check.add_argument("--baseline", default=BASELINE_FILE)
+    check.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args(argv)
+
+    if args.command == "check":
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+    results = run_suite(args.filter, args.warmup, args.repeat)
+    meta = run_metadata()
+
+    if args.command == "bench":
+        append_history(args.history, meta, results)
+        if args.csv:
+            append_csv(args.csv, meta, results)
+        if args.save_baseline:
+            save_baseline(args.save_baseline, meta, results)
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    for name, what, old, new in regressions:
+        print(f"REGRESSION {name}: {what} {old} -> {new}")
+    print(f"{len(regressions)} regression(s) against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
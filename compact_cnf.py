@@ -0,0 +1,166 @@
+"""
+Compact CNF representation
+Clauses live in one flat array('i') of DIMACS literals plus an array of clause
+offsets, so a formula with millions of clauses costs a few bytes per literal
+instead of one Python list per clause.
+"""
+import re
+from array import array
+from operator import itemgetter
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for verify_batch speedups
+    np = None
+
+# values stored in a packed assignment (one byte per variable)
+FALSE, TRUE, UNASSIGNED = 0, 1, 2
+
+VERIFY_CHUNK_BYTES = 64 << 20   # numpy verify_batch: rows x literals per chunk
+
+_SEPARATOR = 2
+_UNSATISFIED_CLAUSE = re.compile(b"\x02\x00*\x02")
+_POSITIVE_TRUE = bytes(1 if b == TRUE else 0 for b in range(256))
+_NEGATIVE_TRUE = bytes(1 if b == FALSE else 0 for b in range(256))
+
+
+class CompactFormula:
+    """
+    CNF formula stored as flat literal buffer + clause offsets.
+
+        literals: array('i') of non-zero DIMACS literals, clauses back to back
+        offsets:  array('q') of length num_clauses + 1, clause i is
+                  literals[offsets[i]:offsets[i + 1]]
+        num_vars: highest variable index
+    """
+
+    def __init__(self, literals, offsets, num_vars=None):
+        self.literals = literals
+        self.offsets = offsets
+        if num_vars is None:
+            num_vars = max((abs(lit) for lit in literals), default=0)
+        self.num_vars = num_vars
+        self._getter = None
+
+    @classmethod
+    def from_clauses(cls, clauses, num_vars=None):
+        """Build from any iterable of clauses (lists of ints)."""
+        literals = array("i")
+        offsets = array("q", [0])
+        for clause in clauses:
+            literals.extend(clause)
+            offsets.append(len(literals))
+        return cls(literals, offsets, num_vars)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def clause(self, i):
+        return self.literals[self.offsets[i]:self.offsets[i + 1]].tolist()
+
+    def clauses(self):
+        """Iterate over the clauses as lists of ints."""
+        lits, offsets = self.literals, self.offsets
+        for i in range(len(offsets) - 1):
+            yield lits[offsets[i]:offsets[i + 1]].tolist()
+
+    # ---- assignments ----
+
+    def pack_assignment(self, assignment):
+        """
+        Convert {var: bool} to a bytearray indexed by variable
+        (TRUE / FALSE / UNASSIGNED). Variables above num_vars are ignored.
+        """
+        n = self.num_vars
+        values = bytearray([UNASSIGNED]) * (n + 1)
+        for var, value in assignment.items():
+            if 0 < var <= n:
+                values[var] = TRUE if value else FALSE
+        return values
+
+    def truth_table(self, values):
+        """
+        Per-literal truth bytes for a packed assignment: truth[2v] is 1 when
+        literal v is true, truth[2v+1] when literal -v is true.
+        """
+        n = self.num_vars
+        if len(values) < n + 1:
+            values = bytes(values) + bytes([UNASSIGNED]) * (n + 1 - len(values))
+        body = memoryview(values)[1:n + 1]
+        truth = bytearray(2 * n + 2)
+        truth[0] = _SEPARATOR   # index 0 separates clauses in verify()
+        truth[2::2] = bytes(body).translate(_POSITIVE_TRUE)
+        truth[3::2] = bytes(body).translate(_NEGATIVE_TRUE)
+        return truth
+
+    def literal_codes(self):
+        """Clauses as tuples of truth_table() indices (2v for v, 2v+1 for -v)."""
+        flat = [2 * lit if lit > 0 else 1 - 2 * lit for lit in self.literals]
+        offsets = self.offsets
+        return [tuple(flat[offsets[i]:offsets[i + 1]]) for i in range(len(offsets) - 1)]
+
+    # ---- verification ----
+
+    def _literal_getter(self):
+        # compiled once: the literal codes of every clause, separated (and
+        # surrounded) by index 0, fetched in one C-level itemgetter call
+        if self._getter is None:
+            flat = [2 * lit if lit > 0 else 1 - 2 * lit for lit in self.literals]
+            offsets = self.offsets
+            codes = [0]
+            for i in range(len(offsets) - 1):
+                codes += flat[offsets[i]:offsets[i + 1]]
+                codes.append(0)
+            self._getter = itemgetter(*codes)
+        return self._getter
+
+    def verify(self, assignment):
+        """
+        True if every clause has a true literal.
+        `assignment` is a {var: bool} dict or a packed bytearray from
+        pack_assignment(). Unassigned variables make no literal true.
+        """
+        if len(self) == 0:
+            return True
+        if isinstance(assignment, dict):
+            assignment = self.pack_assignment(assignment)
+        truth = self.truth_table(assignment)
+        row = bytes(self._literal_getter()(truth))
+        return _UNSATISFIED_CLAUSE.search(row) is None
+
+    def verify_batch(self, assignments):
+        """
+        Verify many assignments at once, returns a list of bools.
+        With numpy every clause is evaluated for a chunk of the batch in one
+        gather + reduceat, the chunks sized so their tables stay around
+        VERIFY_CHUNK_BYTES; without it each assignment goes through verify().
+        """
+        packed = [self.pack_assignment(a) if isinstance(a, dict) else a
+                  for a in assignments]
+        if np is None or not packed:
+            return [self.verify(values) for values in packed]
+
+        n = self.num_vars
+        if len(self) == 0:
+            return [True] * len(packed)
+        lengths = np.diff(np.frombuffer(self.offsets, dtype=np.int64))
+        if (lengths == 0).any():
+            return [False] * len(packed)
+
+        lits = np.frombuffer(self.literals, dtype=np.int32)
+        var = np.abs(lits)
+        wanted = np.where(lits > 0, TRUE, FALSE).astype(np.uint8)
+        starts = np.frombuffer(self.offsets, dtype=np.int64)[:-1]
+        # per row: the assignment, the gathered literal values and their truth
+        rows = max(1, VERIFY_CHUNK_BYTES // (n + 1 + 2 * len(lits)))
+        result = []
+        for first in range(0, len(packed), rows):
+            chunk = packed[first:first + rows]
+            matrix = np.full((len(chunk), n + 1), UNASSIGNED, dtype=np.uint8)
+            for row, values in enumerate(chunk):
+                width = min(len(values), n + 1)
+                matrix[row, :width] = np.frombuffer(bytes(values[:width]), dtype=np.uint8)
+            true_lits = matrix[:, var] == wanted
+            satisfied = np.logical_or.reduceat(true_lits, starts, axis=1)
+            result += satisfied.all(axis=1).tolist()
+        return result
@@ -0,0 +1,282 @@
+"""
+Background solver jobs for the Streamlit dashboard
+A JobManager runs solves in worker processes (at most `workers` at a time)
+so the page never blocks. Workers stream partial results (solutions found
+so far, search statistics) back through a pipe of their own; a pump thread
+folds them into Job objects the page reads on every rerun. Jobs can be
+cancelled: the solvers stop at their next progress poll, and a worker still
+running after CANCEL_GRACE is terminated and its pipe thrown away, so a
+kill in the middle of a send cannot touch another job's messages.
+Completed results are kept per (instance, algorithm).
+"""
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict, deque
+from itertools import count
+from multiprocessing.connection import wait
+from typing import Dict, Optional
+
+from subsetsum import _GroupSearch, dp_subset_sum_mask
+from subsetsum_count import count_solutions
+from subsetsum_mitm import mitm_find_one
+from solver_stats import SolverStats
+
+ALGORITHMS = ("backtracking", "dp", "count", "mitm")
+PROGRESS_SECONDS = 0.5     # worker -> page update period
+MAX_STREAMED = 1000        # solutions kept per job (the count goes on)
+CANCEL_GRACE = 1.0         # seconds before a cancelled worker is terminated
+
+ACTIVE = ("queued", "running")
+
+
+class Job:
+    def __init__(self, job_id, instance, algorithm):
+        self.id = job_id
+        self.instance = instance
+        self.algorithm = algorithm
+        self.status = "queued"     # queued, running, done, cancelled, error
+        self.solutions = []        # index bitmasks streamed so far
+        self.found = 0
+        self.stats = {}            # SolverStats.as_dict() of the worker
+        self.result = None         # final answer (mask, count, ...)
+        self.error = None
+        self.started = None
+        self.finished = None
+
+    @property
+    def active(self):
+        return self.status in ACTIVE
+
+    @property
+    def nodes(self):
+        return self.stats.get("nodes", 0)
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+
+# ---- worker side ----
+
+class _Cancelled(Exception):
+    pass
+
+
+class _Progress:
+    """
+    Batches solutions and sends them with the statistics every
+    PROGRESS_SECONDS; raises _Cancelled from the solvers' progress polls
+    once the job is cancelled.
+    """
+
+    def __init__(self, channel, cancel):
+        self.channel = channel
+        self.cancel = cancel
+        self.batch = []
+        self.found = 0
+        self.stats = SolverStats(progress=self._poll, interval=PROGRESS_SECONDS)
+
+    def _poll(self, stats):
+        if self.cancel.is_set():
+            raise _Cancelled()
+        self.send("progress")
+
+    def solution(self, mask):
+        self.found += 1
+        if self.found <= MAX_STREAMED:
+            self.batch.append(mask)
+        self.stats.tick()
+
+    def send(self, kind, result=None):
+        self.channel.send((kind, {"solutions": self.batch, "found": self.found,
+                                  "stats": self.stats.as_dict(), "result": result}))
+        self.batch = []
+
+
+def _worker(algorithm, nums, target, channel, cancel):
+    progress = _Progress(channel, cancel)
+    try:
+        try:
+            with progress.stats:
+                if algorithm == "backtracking":
+                    search = _GroupSearch(nums, target)
+                    for mask in search.run(search.roots(), should_stop=cancel.is_set):
+                        progress.solution(mask)
+                    result = progress.found
+                elif algorithm == "count":
+                    result = count_solutions(nums, target)
+                elif algorithm in ("dp", "mitm"):
+                    find_one = dp_subset_sum_mask if algorithm == "dp" else mitm_find_one
+                    result = find_one(nums, target)
+                    if result is not None:
+                        progress.solution(result)
+                else:
+                    raise ValueError(f"unknown algorithm {algorithm!r}")
+        except _Cancelled:
+            result = None
+        progress.send("cancelled" if cancel.is_set() else "done", result)
+    except BrokenPipeError:
+        pass  # the page already gave up on this job
+    except Exception as exc:
+        channel.send(("error", {"error": repr(exc)}))
+    finally:
+        channel.close()
+
+
+# ---- page side ----
+
+class JobManager:
+    """
+    Usage (kept alive across reruns with st.cache_resource):
+        manager = JobManager(workers=2)
+        job = manager.submit("p03", "backtracking", nums, target)
+        manager.cancel(job.id)
+        manager.jobs            # every job, oldest first
+    """
+
+    def __init__(self, workers: int = 2):
+        self.workers = workers
+        self.jobs: Dict[int, Job] = OrderedDict()
+        self.completed: Dict[tuple, Job] = {}
+        self._ctx = multiprocessing.get_context()
+        self._waiting = deque()
+        self._running = {}         # job id -> (process, cancel event, cancel time, pipe end)
+        self._ids = count(1)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._pump = threading.Thread(target=self._pump_updates, daemon=True)
+        self._pump.start()
+
+    def submit(self, instance, algorithm, nums, target, rerun=False) -> Job:
+        """
+        Queue a solve, unless the same (instance, algorithm) already
+        completed (rerun=False) or is still active: that job is returned.
+        """
+        with self._lock:
+            key = (instance, algorithm)
+            if not rerun and key in self.completed:
+                return self.completed[key]
+            for job in self.jobs.values():
+                if job.active and (job.instance, job.algorithm) == key:
+                    return job
+            job = Job(next(self._ids), instance, algorithm)
+            self.jobs[job.id] = job
+            self._waiting.append((job, list(nums), target))
+            self._start_ready()
+            return job
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or not job.active:
+                return
+            if job_id in self._running:
+                process, event, _, reader = self._running[job_id]
+                event.set()
+                self._running[job_id] = (process, event, time.monotonic(), reader)
+            else:
+                self._waiting = deque(w for w in self._waiting if w[0].id != job_id)
+                self._finish(job, "cancelled")
+
+    def active_jobs(self):
+        return [job for job in self.jobs.values() if job.active]
+
+    def shutdown(self):
+        self._closed = True
+        with self._lock:
+            for process, event, _, reader in self._running.values():
+                event.set()
+                process.terminate()
+                reader.close()
+            self._running.clear()
+
+    # ---- internals (called with the lock held) ----
+
+    def _start_ready(self):
+        while self._waiting and len(self._running) < self.workers:
+            job, nums, target = self._waiting.popleft()
+            event = self._ctx.Event()
+            reader, writer = self._ctx.Pipe(duplex=False)
+            process = self._ctx.Process(
+                target=_worker, args=(job.algorithm, nums, target, writer, event), daemon=True)
+            process.start()
+            writer.close()   # the worker holds the only write end: EOF when it exits
+            job.status = "running"
+            job.started = time.monotonic()
+            self._running[job.id] = (process, event, None, reader)
+
+    def _finish(self, job, status):
+        job.status = status
+        job.finished = time.monotonic()
+        entry = self._running.pop(job.id, None)
+        if entry is not None:
+            entry[0].join(timeout=0.1)
+            entry[3].close()
+        if status == "done":
+            self.completed[(job.instance, job.algorithm)] = job
+        self._start_ready()
+
+    def _apply(self, job_id, kind, payload):
+        job = self.jobs.get(job_id)
+        if job is None or not job.active:
+            return
+        if kind == "error":
+            job.error = payload["error"]
+            self._finish(job, "error")
+            return
+        job.solutions.extend(payload["solutions"])
+        job.found = payload["found"]
+        job.stats = payload["stats"]
+        if kind in ("done", "cancelled"):
+            job.result = payload["result"]
+            self._finish(job, kind)
+
+    def _reap(self):
+        """Terminate cancelled workers past the grace period, catch crashes."""
+        now = time.monotonic()
+        for job_id, (process, _, cancelled_at, _) in list(self._running.items()):
+            if cancelled_at is not None and now - cancelled_at > CANCEL_GRACE:
+                # last resort: _finish drops the pipe a kill may have left half-written
+                process.terminate()
+                self._finish(self.jobs[job_id], "cancelled")
+            elif not process.is_alive() and process.exitcode not in (0, None):
+                self.jobs[job_id].error = f"worker exited with code {process.exitcode}"
+                self._finish(self.jobs[job_id], "error")
+
+    def _receive(self, job_id, reader):
+        try:
+            kind, payload = reader.recv()
+        except (EOFError, OSError):
+            # the worker is gone without a final message
+            process = self._running[job_id][0]
+            process.join(timeout=0.1)
+            kind, payload = "error", {"error": f"worker exited with code {process.exitcode}"}
+        self._apply(job_id, kind, payload)
+
+    def _pump_updates(self):
+        while not self._closed:
+            with self._lock:
+                readers = {entry[3]: job_id for job_id, entry in self._running.items()}
+            try:
+                ready = wait(list(readers), timeout=0.2) if readers else []
+            except (OSError, ValueError):   # a pipe closed by shutdown()
+                ready = []
+            if not readers:
+                time.sleep(0.2)
+            with self._lock:
+                for reader in ready:
+                    job_id = readers[reader]
+                    if job_id in self._running and self._running[job_id][3] is reader:
+                        self._receive(job_id, reader)
+                self._reap()
+
+
+def wait_for(manager: JobManager, job: Job, timeout: Optional[float] = None):
+    """Block until `job` is no longer active (for scripts and tests)."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while job.active and (deadline is None or time.monotonic() < deadline):
+        time.sleep(0.05)
+    return job
@@ -0,0 +1,146 @@
+"""
+Local repository for SUBSETSUM instances
+Lookup order for load(name):
+  1. in-process LRU
+  2. the local datasets directory (subsetsum_datasets/<name>_{w,c,s}.txt)
+  3. a content-addressed on-disk cache of previously downloaded instances
+  4. the FSU server (the result is added to the cache)
+"""
+import hashlib
+import json
+import os
+import sys
+from array import array
+from collections import OrderedDict
+
+from read_write_files import download_instance_texts, parse_instance_texts
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "subsetsum_datasets")
+CACHE_DIR = os.environ.get(
+    "SUBSETSUM_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "subsetsum_instances"),
+)
+
+_MAGIC = b"SSI1\n"
+_INT64_MAX = (1 << 63) - 1
+
+
+def _encode(nums, target, rows):
+    """Compact binary form: magic, one JSON header line, raw int64 weights."""
+    small = all(-_INT64_MAX <= num <= _INT64_MAX for num in nums)
+    header = {"n": len(nums), "target": str(target), "rows": rows,
+              "byteorder": sys.byteorder}
+    if small:
+        body = array("q", nums).tobytes()
+    else:  # reduced instances can exceed 64 bits: keep them as text
+        header["big"] = [str(num) for num in nums]
+        body = b""
+    return _MAGIC + json.dumps(header).encode() + b"\n" + body
+
+
+def _decode(blob):
+    if not blob.startswith(_MAGIC):
+        raise ValueError("not an instance cache object")
+    end = blob.index(b"\n", len(_MAGIC))
+    header = json.loads(blob[len(_MAGIC):end])
+    if "big" in header:
+        nums = [int(num) for num in header["big"]]
+    else:
+        weights = array("q")
+        weights.frombytes(blob[end + 1:])
+        if header["byteorder"] != sys.byteorder:
+            weights.byteswap()
+        nums = weights.tolist()
+    return nums, int(header["target"]), header["rows"]
+
+
+def _write_atomic(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class InstanceStore:
+    """
+    Loads (weights, target, known 0/1 solution rows) like load_instance,
+    without touching the network once an instance has been seen.
+    """
+
+    def __init__(self, datasets_dir=DATASETS_DIR, cache_dir=CACHE_DIR,
+                 lru_size=64, fetch=download_instance_texts):
+        self.datasets_dir = datasets_dir
+        self.cache_dir = cache_dir
+        self.lru_size = lru_size
+        self.fetch = fetch
+        self._lru = OrderedDict()
+
+    def load(self, name):
+        entry = self._lru.get(name)
+        if entry is None:
+            entry = self._load_local(name) or self._load_cached(name) or self._download(name)
+            self._lru[name] = entry
+            if len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+        else:
+            self._lru.move_to_end(name)
+        nums, target, rows = entry
+        return list(nums), target, list(rows)
+
+    # ---- sources ----
+
+    def _load_local(self, name):
+        paths = [os.path.join(self.datasets_dir, f"{name}_{suffix}.txt")
+                 for suffix in ("w", "c", "s")]
+        if not all(os.path.exists(path) for path in paths):
+            return None
+        texts = []
+        for path in paths:
+            with open(path) as f:
+                texts.append(f.read())
+        return self._freeze(*parse_instance_texts(*texts))
+
+    def _ref_path(self, name):
+        return os.path.join(self.cache_dir, "refs", name)
+
+    def _object_path(self, digest):
+        return os.path.join(self.cache_dir, "objects", digest[:2], digest + ".bin")
+
+    def _load_cached(self, name):
+        try:
+            with open(self._ref_path(name)) as f:
+                digest = f.read().strip()
+            with open(self._object_path(digest), "rb") as f:
+                return self._freeze(*_decode(f.read()))
+        except (OSError, ValueError):
+            return None
+
+    def _download(self, name):
+        texts = self.fetch(name)
+        digest = hashlib.sha256("\0".join(texts).encode()).hexdigest()
+        nums, target, rows = parse_instance_texts(*texts)
+        obj = self._object_path(digest)
+        try:
+            os.makedirs(os.path.dirname(obj), exist_ok=True)
+            os.makedirs(os.path.dirname(self._ref_path(name)), exist_ok=True)
+            if not os.path.exists(obj):
+                _write_atomic(obj, _encode(nums, target, rows))
+            _write_atomic(self._ref_path(name), digest.encode())
+        except OSError:
+            pass  # read-only cache dir: still return the instance
+        return self._freeze(nums, target, rows)
+
+    @staticmethod
+    def _freeze(nums, target, rows):
+        return tuple(nums), target, tuple(rows)
+
+
+_default_store = None
+
+
+def default_store():
+    """Process-wide store used by read_write_files.load_instance."""
+    global _default_store
+    if _default_store is None:
+        _default_store = InstanceStore()
+    return _default_store
@@ -0,0 +1,280 @@
+"""
+Portfolio front end
+Picks solvers for an instance from cheap features, races the best few in
+separate processes under a wall-clock budget, returns the first verified
+answer and terminates the others. Each decision can be appended to a JSON
+lines log (PORTFOLIO_LOG or log_path) to tune the selection rules.
+
+    result = solve_subsetsum(nums, target, budget=10)
+    result.status   # "sat", "unsat", "timeout" or "error"
+    result.answer   # index bitmask / {var: bool} / None
+    result.engine   # name of the engine that answered
+"""
+import json
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from multiprocessing.connection import wait
+from typing import List, Optional
+
+from sat import solve_sat_bruteforce_vectorized, verify_sat
+from sat_cdcl import solve_sat_cdcl
+from sat_preprocess import solve_sat_preprocessed
+from subsetsum import dp_subset_sum_mask, iter_subsets, mask_to_subset
+from subsetsum_digits import digit_layout, solve_digits
+from subsetsum_mitm import mitm_find_one
+
+DEFAULT_BUDGET = 30.0         # seconds
+INLINE_COST = 1e5             # run the first choice in-process below this cost
+INLINE_SECONDS = 1.0          # ... for at most this long, then race
+DP_MAX_TARGET_BITS = 30
+MITM_MAX_ITEMS = 48
+BRUTEFORCE_MAX_VARS = 22
+SPARSE_DIGITS = 0.25          # digit_layout cells that are non-zero below this: columns
+
+
+class PortfolioResult:
+    def __init__(self, status, answer, engine, elapsed, features, engines):
+        self.status = status
+        self.answer = answer
+        self.engine = engine
+        self.elapsed = elapsed
+        self.features = features
+        self.engines = engines
+
+    def __repr__(self):
+        return (f"PortfolioResult(status={self.status!r}, engine={self.engine!r}, "
+                f"elapsed={self.elapsed:.3f})")
+
+
+# ---- engines (module level so they can run in child processes) ----
+
+def _backtracking_one(nums, target):
+    return next(iter_subsets(nums, target, distinct=True), None)
+
+
+SUBSETSUM_ENGINES = {
+    "dp": dp_subset_sum_mask,
+    "mitm": mitm_find_one,
+    "digits": solve_digits,
+    "backtracking": _backtracking_one,
+}
+
+SAT_ENGINES = {
+    "bruteforce_vectorized": solve_sat_bruteforce_vectorized,
+    "cdcl": solve_sat_cdcl,
+    "preprocessed": solve_sat_preprocessed,
+}
+
+
+# ---- features and selection ----
+
+def subsetsum_features(nums: List[int], target: int):
+    n = len(nums)
+    max_bits = max((abs(num).bit_length() for num in nums), default=0)
+    negative = target < 0 or any(num < 0 for num in nums)
+    # column structure (sat_to_subsetsum_base2 outputs): digits solves it exactly
+    layout = None if negative or not nums else digit_layout(nums, target)
+    return {
+        "n": n,
+        "log_target": abs(target).bit_length(),
+        "max_bits": max_bits,
+        "density": n / max_bits if max_bits else float(n),
+        "negative": negative,
+        "carry_free": layout is not None and layout.carry_free,
+        "nonzero_digits": layout.nonzero_digits() if layout is not None else 0,
+        "digit_density": (layout.nonzero_digits() / ((n + 1) * len(layout.columns))
+                          if layout is not None and layout.columns else 1.0),
+    }
+
+
+def subsetsum_costs(features):
+    """Rough cost estimate of each applicable engine (lower runs first)."""
+    n, density = features["n"], features["density"]
+    costs = {"backtracking": 2.0 ** min(n, n * density)}
+    if not features["negative"] and features["log_target"] <= DP_MAX_TARGET_BITS:
+        costs["dp"] = n * 2.0 ** features["log_target"] / 64
+    if n <= MITM_MAX_ITEMS:
+        costs["mitm"] = n * 2.0 ** (n / 2)
+    if features["carry_free"] or features["digit_density"] < SPARSE_DIGITS:
+        costs["digits"] = float(n * features["nonzero_digits"])
+    return costs
+
+
+def sat_features(clauses, num_vars: int):
+    lengths = [len(clause) for clause in clauses]
+    m = len(lengths)
+    return {
+        "num_vars": num_vars,
+        "num_clauses": m,
+        "ratio": m / num_vars if num_vars else 0.0,
+        "max_clause": max(lengths, default=0),
+        "binary_fraction": sum(1 for k in lengths if k == 2) / m if m else 0.0,
+    }
+
+
+def sat_costs(features):
+    n, m = features["num_vars"], features["num_clauses"]
+    costs = {"cdcl": 10.0 * (m + 1) * (n + 1)}
+    # preprocessing pays off on bigger formulas and many binary clauses
+    costs["preprocessed"] = costs["cdcl"] * (0.8 if m >= 100 or features["binary_fraction"] > 0.3
+                                             else 1.2)
+    if n <= BRUTEFORCE_MAX_VARS:
+        costs["bruteforce_vectorized"] = 2.0 ** n * (m + 1) / 16
+    return costs
+
+
+def _ranked(costs):
+    return sorted(costs, key=costs.get)
+
+
+# ---- racing ----
+
+def _engine_main(conn, func, args):
+    try:
+        result = ("done", func(*args))
+    except BaseException as exc:  # report everything, the parent decides
+        result = ("error", repr(exc))
+    conn.send(result)
+    conn.close()
+
+
+def _race(registry, engines, args, verify, budget):
+    """
+    Run every engine in its own process. Returns (status, answer, engine):
+    the first answer that passes verify(), or "timeout" / "error".
+    A None answer (no solution) is accepted as is: every engine is complete.
+    """
+    ctx = multiprocessing.get_context()
+    running = {}
+    for name in engines:
+        reader, writer = ctx.Pipe(duplex=False)
+        process = ctx.Process(target=_engine_main, args=(writer, registry[name], args),
+                              daemon=True)
+        process.start()
+        writer.close()
+        running[reader] = (name, process)
+    deadline = time.monotonic() + budget
+    try:
+        while running:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return "timeout", None, None
+            for reader in wait(list(running), timeout=remaining):
+                name, process = running.pop(reader)
+                try:
+                    outcome, value = reader.recv()
+                except EOFError:  # the process died without an answer
+                    outcome, value = "error", None
+                reader.close()
+                if outcome == "done" and (value is None or verify(value)):
+                    return ("unsat" if value is None else "sat"), value, name
+        return "error", None, None   # every engine failed
+    finally:
+        for reader, (name, process) in running.items():
+            process.terminate()
+            reader.close()
+        for _, process in running.values():
+            process.join()
+
+
+class _InlineTimeout(Exception):
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise _InlineTimeout()
+
+
+def _can_run_inline():
+    return hasattr(signal, "SIGALRM") and threading.current_thread() is threading.main_thread()
+
+
+def _run_inline(func, args, seconds):
+    """func(*args) under a SIGALRM timer; raises _InlineTimeout when it fires."""
+    previous = signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        return func(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _run(kind, registry, costs, args, verify, budget, engines, workers, features, log_path):
+    start = time.perf_counter()
+    ranked = list(engines) if engines else _ranked(costs)
+    status = None
+    if not engines and costs[ranked[0]] <= INLINE_COST and _can_run_inline():
+        # cheap first choice: try it in-process, then race if it overruns
+        chosen = ranked[:1]
+        try:
+            answer = _run_inline(registry[chosen[0]], args, min(INLINE_SECONDS, budget))
+        except _InlineTimeout:
+            pass
+        else:
+            if answer is None:
+                status, engine = "unsat", chosen[0]
+            elif verify(answer):
+                status, engine = "sat", chosen[0]
+            else:
+                status, answer, engine = "error", None, None
+    if status is None:
+        workers = workers or max(2, os.cpu_count() or 1)
+        chosen = ranked[:workers]
+        remaining = budget - (time.perf_counter() - start)
+        status, answer, engine = _race(registry, chosen, args, verify, remaining)
+    result = PortfolioResult(status, answer, engine, time.perf_counter() - start,
+                             features, chosen)
+    log_path = log_path or os.environ.get("PORTFOLIO_LOG")
+    if log_path:
+        _log(log_path, kind, result)
+    return result
+
+
+def _log(path, kind, result):
+    record = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "kind": kind,
+        "features": result.features,
+        "engines": result.engines,
+        "winner": result.engine,
+        "status": result.status,
+        "elapsed": result.elapsed,
+    }
+    with open(path, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+# ---- public front ends ----
+
+def solve_subsetsum(nums: List[int], target: int, budget: float = DEFAULT_BUDGET,
+                    engines: Optional[List[str]] = None, workers: Optional[int] = None,
+                    log_path: Optional[str] = None) -> PortfolioResult:
+    """
+    One subset of nums summing to target (answer = index bitmask).
+    `engines` forces the engines to race (names of SUBSETSUM_ENGINES);
+    by default they are ranked by subsetsum_costs and the `workers` best
+    are raced (at least 2).
+    """
+    features = subsetsum_features(nums, target)
+    costs = subsetsum_costs(features)
+
+    def verify(mask):
+        return sum(mask_to_subset(nums, mask)) == target
+
+    return _run("subsetsum", SUBSETSUM_ENGINES, costs, (nums, target), verify, budget,
+                engines, workers, features, log_path)
+
+
+def solve_sat(clauses, num_vars: int, budget: float = DEFAULT_BUDGET,
+              engines: Optional[List[str]] = None, workers: Optional[int] = None,
+              log_path: Optional[str] = None) -> PortfolioResult:
+    """Same as solve_subsetsum for a CNF formula (answer = {var: bool})."""
+    features = sat_features(clauses, num_vars)
+    costs = sat_costs(features)
+    return _run("sat", SAT_ENGINES, costs, (clauses, num_vars),
+                lambda model: verify_sat(clauses, model), budget,
+                engines, workers, features, log_path)
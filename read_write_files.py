@@ -1,5 +1,11 @@
-import requests
+import gzip
+import lzma
+import mmap
+import os
+import re
+from array import array
 from typing import List
+from compact_cnf import CompactFormula
 #dimacs reader/writer for SAT/3-SAT
 def dimacs_reader(filepath):
     output=[]
@@ -23,62 +29,283 @@ def write_dimacs(filepath, num_variables, clauses):
     """
     Write clauses to a DIMACS CNF file.
     """
-    with open(filepath, "w") as f:
+    write_dimacs_stream(filepath, num_variables, clauses, len(clauses))
+
+
+# streaming DIMACS: compressed input, lazy clauses, flat buffers
+READ_CHUNK = 1 << 20    # bytes parsed per batch
+WRITE_BATCH = 1 << 16   # clauses joined per write() call
+_SPECIAL_LINE = re.compile(rb"^[ \t]*[cp%]", re.M)
+
+
+def _open_cnf(filepath, mode="rb"):
+    """Open a plain, .gz or .xz CNF file."""
+    if filepath.endswith(".gz"):
+        return gzip.open(filepath, mode)
+    if filepath.endswith(".xz"):
+        return lzma.open(filepath, mode)
+    return open(filepath, mode)
+
+
+class _HeaderCheck:
+    """Checks the clauses read so far against the `p cnf` counts."""
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.num_variables = None
+        self.num_clauses = None
+
+    def header(self, line):
+        parts = line.split()
+        if len(parts) != 4 or parts[1] != b"cnf":
+            raise ValueError(f"{self.filepath}: bad header {line.strip()!r}")
+        self.num_variables, self.num_clauses = int(parts[2]), int(parts[3])
+
+    def values(self, values):
+        if self.num_variables is None or not values:
+            return
+        bound = max(max(values), -min(values))
+        if bound > self.num_variables:
+            raise ValueError(f"{self.filepath}: variable {bound} above the "
+                             f"{self.num_variables} declared in the header")
+
+    def clauses(self, count):
+        if self.num_clauses is not None and count > self.num_clauses:
+            raise ValueError(f"{self.filepath}: more than the {self.num_clauses} "
+                             f"clauses declared in the header")
+
+    def done(self, count):
+        if self.num_clauses is not None and count != self.num_clauses:
+            raise ValueError(f"{self.filepath}: header declares {self.num_clauses} "
+                             f"clauses, found {count}")
+
+
+def _cnf_values(f, check):
+    """
+    Yield the DIMACS integers of a file as array('i') batches (0 ends a
+    clause). Comments, the header and the SATLIB '%' end marker are handled
+    line by line, everything else a whole chunk at a time.
+    """
+    while True:
+        chunk = f.read(READ_CHUNK)
+        if not chunk:
+            return
+        chunk += f.readline()
+        if _SPECIAL_LINE.search(chunk) is None:
+            values = array("i", map(int, chunk.split()))
+            check.values(values)
+            yield values
+            continue
+        for line in chunk.splitlines():
+            line = line.lstrip()
+            first = line[:1]
+            if first == b"" or first == b"c":
+                continue
+            if first == b"p":
+                check.header(line)
+                continue
+            if first == b"%":
+                return
+            values = array("i", map(int, line.split()))
+            check.values(values)
+            yield values
+
+
+def _clause_ends(values, pos=0):
+    """Indices of the clause-terminating zeros in `values`, from `pos`."""
+    while True:
+        try:
+            end = values.index(0, pos)
+        except ValueError:
+            return
+        yield end
+        pos = end + 1
+
+
+def iter_dimacs_clauses(filepath):
+    """
+    Lazily yield the clauses of a DIMACS file (plain, .gz or .xz) as lists.
+    Clauses may span several lines; header counts are checked on the fly.
+    """
+    check = _HeaderCheck(filepath)
+    count = 0
+    pending = []   # clause still open at the end of the previous batch
+    with _open_cnf(filepath) as f:
+        for values in _cnf_values(f, check):
+            pos = 0
+            for end in _clause_ends(values):
+                clause = values[pos:end].tolist()
+                if pending:
+                    clause = pending + clause
+                    pending = []
+                count += 1
+                yield clause
+                pos = end + 1
+            check.clauses(count)
+            if pos < len(values):
+                pending += values[pos:].tolist()
+    if pending:  # last clause without its terminating 0
+        count += 1
+        yield pending
+    check.done(count)
+
+
+def read_dimacs_header(filepath):
+    """(num_variables, num_clauses) from the `p cnf` line, or None."""
+    with _open_cnf(filepath) as f:
+        for line in f:
+            line = line.lstrip()
+            if line[:1] == b"p":
+                check = _HeaderCheck(filepath)
+                check.header(line)
+                return check.num_variables, check.num_clauses
+            if line[:1] not in (b"", b"c"):
+                return None
+    return None
+
+
+def read_dimacs_compact(filepath):
+    """
+    Parse a DIMACS file straight into a CompactFormula (flat literal buffer +
+    clause offsets) without building a list per clause. Plain files are read
+    through mmap, .gz/.xz files are decompressed as a stream.
+    """
+    check = _HeaderCheck(filepath)
+    literals = array("i")
+    offsets = array("q", [0])
+
+    def parse(f):
+        for values in _cnf_values(f, check):
+            pos = 0
+            for end in _clause_ends(values):
+                literals.extend(values[pos:end])
+                offsets.append(len(literals))
+                pos = end + 1
+            literals.extend(values[pos:])
+            check.clauses(len(offsets) - 1)
+        if offsets[-1] != len(literals):
+            offsets.append(len(literals))
+
+    if filepath.endswith((".gz", ".xz")) or os.path.getsize(filepath) == 0:
+        with _open_cnf(filepath) as f:
+            parse(f)
+    else:
+        with open(filepath, "rb") as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            parse(mm)
+    check.done(len(offsets) - 1)
+    return CompactFormula(literals, offsets, check.num_variables)
+
+
+def write_dimacs_stream(filepath, num_variables, clauses, num_clauses=None):
+    """
+    Write clauses from any iterable to a DIMACS file (.gz/.xz compressed
+    according to the extension), batching lines into large writes.
+
+    When num_clauses is None and `clauses` has no len(), or num_variables is
+    a callable (evaluated once every clause is written), a fixed-width
+    placeholder header is written first and backpatched at the end; this
+    needs an uncompressed output file.
+    Returns the (num_variables, num_clauses) written in the header.
+    """
+    if num_clauses is None and hasattr(clauses, "__len__"):
+        num_clauses = len(clauses)
+    backpatch = num_clauses is None or callable(num_variables)
+    if backpatch and filepath.endswith((".gz", ".xz")):
+        raise ValueError("compressed output needs the header counts up front")
+
+    count = 0
+    with _open_cnf(filepath, "wt") as f:
         # Header
-        f.write(f"p cnf {num_variables} {len(clauses)}\n")
-        
-        # Write each clause
+        if backpatch:
+            f.write(_header_line(0, 0, HEADER_WIDTH))
+        else:
+            f.write(_header_line(num_variables, num_clauses))
+
+        batch = []
         for clause in clauses:
-            line = " ".join(str(lit) for lit in clause) + " 0\n"
-            f.write(line)
+            batch.append(" ".join(map(str, clause)))
+            if len(batch) == WRITE_BATCH:
+                f.write(" 0\n".join(batch) + " 0\n")
+                count += len(batch)
+                batch = []
+        if batch:
+            f.write(" 0\n".join(batch) + " 0\n")
+            count += len(batch)
+
+        if callable(num_variables):
+            num_variables = num_variables()
+        if num_clauses is not None and num_clauses != count:
+            raise ValueError(f"{filepath}: {count} clauses written, "
+                             f"header says {num_clauses}")
+        num_clauses = count
+        if backpatch:
+            f.seek(0)
+            f.write(_header_line(num_variables, num_clauses, HEADER_WIDTH))
+    return num_variables, num_clauses
+
+
+HEADER_WIDTH = 20   # digits reserved per count in a backpatched header
+
+
+def _header_line(num_variables, num_clauses, width=0):
+    return f"p cnf {num_variables:<{width}} {num_clauses:<{width}}\n"
+
 
 # reader/Writer for SUBSETSUM
 BASE_URL = "https://people.sc.fsu.edu/~jburkardt/datasets/subset_sum"
 
-def load_instance(instance: str):
-   
-    # Download weights
-    w_url = f"{BASE_URL}/{instance}_w.txt"
-    w_resp = requests.get(w_url)
-    w_resp.raise_for_status()
-    w_text = w_resp.text.strip()
+def parse_instance_texts(w_text: str, c_text: str, s_text: str):
+    """Parse the contents of the _w, _c and _s files of an instance."""
     # numbers may span multiple lines
     nums: List[int] = []
-    for line in w_text.splitlines():
+    for line in w_text.strip().splitlines():
         if line.strip():
             nums.extend(map(int, line.split()))
-
-    # Download target
-    c_url = f"{BASE_URL}/{instance}_c.txt"
-    c_resp = requests.get(c_url)
-    c_resp.raise_for_status()
-    target = int(c_resp.text.strip())
-
-    # Download known 0/1 solutions
-    s_url = f"{BASE_URL}/{instance}_s.txt"
-    s_resp = requests.get(s_url)
-    s_resp.raise_for_status()
+    target = int(c_text.strip())
     known_solutions_01 = [
-        line.strip() for line in s_resp.text.splitlines() if line.strip()
+        line.strip() for line in s_text.splitlines() if line.strip()
     ]
-
     return nums, target, known_solutions_01
 
 
-def write_subsetsum_instance(prefix, weights, target, solutions=None):
+def download_instance_texts(instance: str):
+    """Raw (_w, _c, _s) file contents of an instance from the FSU server."""
+    import requests  # only needed for instances that are not on disk yet
+    texts = []
+    for suffix in ("w", "c", "s"):
+        resp = requests.get(f"{BASE_URL}/{instance}_{suffix}.txt")
+        resp.raise_for_status()
+        texts.append(resp.text)
+    return tuple(texts)
+
+
+def load_instance(instance: str):
+    """
+    (weights, target, known 0/1 solution rows) of an instance. Served by the
+    instance store: local datasets first, then the on-disk cache, then the
+    FSU server.
+    """
+    from instance_store import default_store
+    return default_store().load(instance)
+
+
+def write_subsetsum_instance(prefix, weights, target, solutions=None,
+                             directory="reduced_subsetsum"):
     """
-    Writes a SUBSETSUM instance in the format:
+    Writes a SUBSETSUM instance in `directory` in the format:
       prefix_c.txt : target
       prefix_w.txt : weights
       prefix_s.txt : solutions (vertical binary format)
     """
+    base = os.path.join(directory, prefix)
 
     # write target
-    with open(f"reduced_subsetsum/{prefix}_c.txt", "w") as f:
+    with open(f"{base}_c.txt", "w") as f:
         f.write(str(target) + "\n")
 
     # write weights
-    with open(f"reduced_subsetsum/{prefix}_w.txt", "w") as f:
+    with open(f"{base}_w.txt", "w") as f:
         for w in weights:
             f.write(str(w) + "\n")
 
@@ -87,7 +314,7 @@ def write_subsetsum_instance(prefix, weights, target, solutions=None):
         num_weights = len(weights)
         num_solutions = len(solutions)
 
-        with open(f"reduced_subsetsum/{prefix}_s.txt", "w") as f:
+        with open(f"{base}_s.txt", "w") as f:
             for i in range(num_weights):        # for each weight
                 row = []
                 for k in range(num_solutions):  # for each solution
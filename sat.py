@@ -5,6 +5,8 @@ Master MIV Project - USTHB 2025
 import time
 import random
 from itertools import product
+from compact_cnf import CompactFormula
+from solver_stats import active_stats, counted
 
 # PARTIE 1 : VERIFICATEUR DE SOLUTION
 
@@ -21,7 +23,14 @@ def verify_sat(formula, assignment):
     
     Returns:
         bool: True si satisfaite, False sinon
+
+    Une CompactFormula déjà compilée est vérifiée par CompactFormula.verify ;
+    une liste de clauses est parcourue directement (arrêt à la première
+    clause fausse), sans la compiler à chaque appel.
     """
+    if isinstance(formula, CompactFormula):
+        return formula.verify(assignment)
+
     for clause in formula:
         clause_satisfied = False
         
@@ -43,26 +52,138 @@ def verify_sat(formula, assignment):
     return True  # Toutes les clauses satisfaites
 
 # PARTIE 2 : SOLVEUR SAT (Question 1) - FORCE BRUTE 
-def solve_sat_bruteforce(formula, num_vars):
+def solve_sat_bruteforce(formula, num_vars, stats=None):
     """
     Résout SAT par force brute (teste toutes les combinaisons)
     Args:
         formula: Formule au format DIMACS
-        num_vars: nombre de variables (int)
+        num_vars: nombre de variables (int) ou liste des variables
+        stats: SolverStats optionnel (nodes = affectations testées)
+    Returns:
+        dict: Affectation satisfaisante, ou None si impossible
+    """
+    variables = _variable_list(num_vars)
+    n = len(variables)
+
+    compiled = CompactFormula.from_clauses(formula)
+    clauses = compiled.literal_codes()
+    # truth[2v] / truth[2v+1] : littéral v / -v vrai (variables hors formule ignorées)
+    truth = compiled.truth_table(compiled.pack_assignment({}))
+    slots = [(i, 2 * var) for i, var in enumerate(variables)
+             if 0 < var <= compiled.num_vars]
+
+    assignments = product([False, True], repeat=n)
+    stats = active_stats(stats)
+    if stats is not None:
+        assignments = counted(assignments, stats)
+
+    for values in assignments:
+        for i, code in slots:
+            truth[code] = values[i]
+            truth[code + 1] = not values[i]
+        # Vérifier si ça marche (arrêt à la première clause fausse)
+        for clause in clauses:
+            for code in clause:
+                if truth[code]:
+                    break
+            else:
+                break
+        else:
+            # Créer l'affectation 
+            return dict(zip(variables, values))
+
+    return None # Aucune solution
+
+
+def _variable_list(num_vars):
+    # Les appels existants passent soit un entier, soit la liste des variables
+    if isinstance(num_vars, int):
+        return list(range(1, num_vars + 1))
+    return list(num_vars)
+
+
+def _bit_pattern(bit, width):
+    """
+    Masque de 2^width bits dont le bit r vaut le bit `bit` de r
+    (ex: bit=0 -> ...1010, bit=1 -> ...1100).
+    """
+    rows = 1 << width
+    period = 1 << (bit + 1)
+    block = ((1 << (1 << bit)) - 1) << (1 << bit)   # 0..01..1 sur une période
+    repeat = ((1 << rows) - 1) // ((1 << period) - 1)
+    return repeat * block
+
+
+def solve_sat_bruteforce_vectorized(formula, num_vars, block_bits=16, stats=None):
+    """
+    Force brute bit-parallèle : les 2^block_bits affectations d'un bloc sont
+    évaluées en même temps, une ligne par bit d'un entier Python.
+    Les `block_bits` dernières variables varient à l'intérieur du bloc, les
+    autres sont fixées par le numéro de bloc. Chaque clause devient un OU de
+    masques et la formule un ET ; le premier bit à 1 donne la solution.
+
+    Même ordre d'exploration que solve_sat_bruteforce, donc même résultat.
+    Args:
+        formula: Formule au format DIMACS
+        num_vars: nombre de variables (int) ou liste des variables
+        block_bits: log2 de la taille d'un bloc
+        stats: SolverStats optionnel (nodes = affectations couvertes,
+               prunes["clause"] = blocs entièrement réfutés)
     Returns:
         dict: Affectation satisfaisante, ou None si impossible
     """
-    variables = list(range(1, num_vars + 1))
-    n = num_vars
-
-    for values in product([False, True], repeat=n):
-        # Créer l'affectation 
-        assignment = {}
-        for i in range(n):
-            assignment[variables[i]] = values[i]
-        # Vérifier si ça marche
-        if verify_sat(formula, assignment):
-            return assignment
+    variables = _variable_list(num_vars)
+    n = len(variables)
+    k = min(block_bits, n)
+    high = n - k                        # variables fixées par bloc
+    position = {var: i for i, var in enumerate(variables)}
+    full = (1 << (1 << k)) - 1
+
+    # Partie "bloc" de chaque clause : OU des masques de ses littéraux bas
+    base = full
+    mixed = []  # (littéraux hauts [(position, signe)], masque bas)
+    for clause in formula:
+        low_mask = 0
+        high_lits = []
+        for literal in clause:
+            pos = position.get(abs(literal))
+            if pos is None:
+                continue  # variable jamais affectée -> littéral faux
+            if pos >= high:
+                pattern = _bit_pattern(n - 1 - pos, k)
+                low_mask |= pattern if literal > 0 else full ^ pattern
+            else:
+                high_lits.append((high - 1 - pos, literal > 0))
+        if high_lits:
+            mixed.append((high_lits, low_mask))
+        else:
+            base &= low_mask
+    stats = active_stats(stats)
+    if not base:
+        if stats is not None:
+            stats.prune("clause", 1 << high)
+        return None
+
+    blocks = range(1 << high)
+    if stats is not None:
+        blocks = counted(blocks, stats, weight=1 << k, every=16)
+    for block in blocks:
+        rows = base
+        for high_lits, low_mask in mixed:
+            for bit, positive in high_lits:
+                if ((block >> bit) & 1) == positive:
+                    break  # clause satisfaite par une variable haute
+            else:
+                rows &= low_mask
+                if not rows:
+                    if stats is not None:
+                        stats.prune("clause")
+                    break
+        if rows:
+            row = (rows & -rows).bit_length() - 1
+            index = (block << k) | row
+            return {var: bool((index >> (n - 1 - i)) & 1)
+                    for i, var in enumerate(variables)}
 
     return None # Aucune solution
 
@@ -125,9 +246,9 @@ def benchmark_solver():
         formula, variables = generate_random_formula(num_vars, num_clauses)
         
         # Mesurer le temps
-        start_time = time.time()
+        start_time = time.perf_counter()
         solution = solve_sat_bruteforce(formula, variables)
-        end_time = time.time()
+        end_time = time.perf_counter()
         
         # Calculer temps écoulé
         elapsed = end_time - start_time
@@ -0,0 +1,491 @@
+"""
+CDCL SAT solver
+Conflict-driven clause learning with two watched literals, VSIDS branching,
+Luby restarts and LBD-based learned clause deletion.
+"""
+import heapq
+
+from solver_stats import active_stats
+
+# Literals are encoded internally as 2*var (positive) and 2*var+1 (negative),
+# so the negation of a literal code is code ^ 1.
+
+
+def _encode(lit):
+    return 2 * lit if lit > 0 else 2 * (-lit) + 1
+
+
+def _decode(code):
+    return code >> 1 if not code & 1 else -(code >> 1)
+
+
+def _luby(i):
+    """i-th element (0-based) of the Luby sequence 1 1 2 1 1 2 4 ..."""
+    size, seq = 1, 0
+    while size < i + 1:
+        seq += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) >> 1
+        seq -= 1
+        i %= size
+    return 1 << seq
+
+
+class _Clause:
+    __slots__ = ("lits", "learnt", "lbd", "activity", "deleted")
+
+    def __init__(self, lits, learnt=False, lbd=0):
+        self.lits = lits
+        self.learnt = learnt
+        self.lbd = lbd
+        self.activity = 0.0
+        self.deleted = False
+
+
+class CDCLSolver:
+    """
+    CDCL solver over DIMACS-style clauses.
+
+    Usage:
+        solver = CDCLSolver(num_vars)
+        solver.add_clause([1, -2])
+        if solver.solve():
+            solver.model()   # {var: bool}
+
+    The solver is incremental: clauses can be added between solve() calls,
+    and learned clauses, activities and saved phases are kept. solve() takes
+    assumptions (literals forced true for that call only); when it fails
+    because of them, unsat_core() gives the subset of assumptions used.
+    """
+
+    RESTART_UNIT = 100
+    VAR_DECAY = 0.95
+    CLAUSE_DECAY = 0.999
+
+    def __init__(self, num_vars=0):
+        self.num_vars = 0
+        self.ok = True
+        self.clauses = []
+        self.learnts = []
+        self.watches = [[], []]
+        self.value = [0, 0]        # per literal code: 1 true, -1 false, 0 unassigned
+        self.level = [0]
+        self.reason = [None]
+        self.activity = [0.0]
+        self.polarity = [False]
+        self.seen = [False]
+        self.heap = []
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+        self.var_inc = 1.0
+        self.cla_inc = 1.0
+        self.max_learnts = 0
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+        self.deleted_learnts = 0
+        self._model = None
+        self.assumptions = []
+        self._core = []
+        self.new_var(num_vars)
+
+    # ---- problem construction ----
+
+    def new_var(self, count=1):
+        """Add `count` fresh variables, returns the last variable index."""
+        for _ in range(count):
+            self.num_vars += 1
+            v = self.num_vars
+            self.watches.extend(([], []))
+            self.value.extend((0, 0))
+            self.level.append(0)
+            self.reason.append(None)
+            self.activity.append(0.0)
+            self.polarity.append(False)
+            self.seen.append(False)
+            heapq.heappush(self.heap, (0.0, v))
+        return self.num_vars
+
+    def add_clause(self, clause):
+        """
+        Add a clause (list of non-zero ints). Returns False once the formula
+        is known to be unsatisfiable at decision level 0.
+        """
+        if not self.ok:
+            return False
+        self._cancel_until(0)
+        top = max((abs(lit) for lit in clause), default=0)
+        if top > self.num_vars:
+            self.new_var(top - self.num_vars)
+
+        value = self.value
+        lits = []
+        for code in sorted(set(_encode(lit) for lit in clause)):
+            if value[code] == 1 or (lits and lits[-1] == code ^ 1):
+                return True          # satisfied at level 0, or tautology
+            if value[code] == 0:
+                lits.append(code)
+
+        if not lits:
+            self.ok = False
+        elif len(lits) == 1:
+            self._enqueue(lits[0], None)
+            self.ok = self._propagate() is None
+        else:
+            c = _Clause(lits)
+            self.clauses.append(c)
+            self._attach(c)
+        return self.ok
+
+    # ---- core machinery ----
+
+    def _attach(self, c):
+        self.watches[c.lits[0]].append(c)
+        self.watches[c.lits[1]].append(c)
+
+    def _decision_level(self):
+        return len(self.trail_lim)
+
+    def _enqueue(self, code, reason):
+        v = code >> 1
+        self.value[code] = 1
+        self.value[code ^ 1] = -1
+        self.level[v] = len(self.trail_lim)
+        self.reason[v] = reason
+        self.trail.append(code)
+
+    def _cancel_until(self, level):
+        if len(self.trail_lim) <= level:
+            return
+        value, reason, polarity = self.value, self.reason, self.polarity
+        activity, heap = self.activity, self.heap
+        start = self.trail_lim[level]
+        for code in reversed(self.trail[start:]):
+            v = code >> 1
+            value[code] = 0
+            value[code ^ 1] = 0
+            reason[v] = None
+            polarity[v] = not code & 1
+            heapq.heappush(heap, (-activity[v], v))
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.qhead = len(self.trail)
+
+    def _propagate(self):
+        """Unit propagation; returns a conflicting clause or None."""
+        value, watches, trail = self.value, self.watches, self.trail
+        level, reason = self.level, self.reason
+        dlevel = len(self.trail_lim)
+        conflict = None
+        while self.qhead < len(trail):
+            false_lit = trail[self.qhead] ^ 1
+            self.qhead += 1
+            self.propagations += 1
+            ws = watches[false_lit]
+            kept = []
+            i, n = 0, len(ws)
+            while i < n:
+                c = ws[i]
+                i += 1
+                if c.deleted:
+                    continue
+                lits = c.lits
+                if lits[0] == false_lit:
+                    lits[0], lits[1] = lits[1], false_lit
+                first = lits[0]
+                if value[first] == 1:
+                    kept.append(c)
+                    continue
+                for k in range(2, len(lits)):
+                    if value[lits[k]] != -1:
+                        lits[1], lits[k] = lits[k], false_lit
+                        watches[lits[1]].append(c)
+                        break
+                else:
+                    kept.append(c)
+                    if value[first] == -1:
+                        conflict = c
+                        kept.extend(ws[i:])
+                        break
+                    # inline _enqueue
+                    value[first] = 1
+                    value[first ^ 1] = -1
+                    level[first >> 1] = dlevel
+                    reason[first >> 1] = c
+                    trail.append(first)
+            watches[false_lit] = kept
+            if conflict is not None:
+                self.qhead = len(trail)
+                return conflict
+        return None
+
+    def _bump_var(self, v):
+        activity = self.activity
+        activity[v] += self.var_inc
+        if activity[v] > 1e100:
+            for u in range(1, self.num_vars + 1):
+                activity[u] *= 1e-100
+            self.var_inc *= 1e-100
+            self._rebuild_heap()
+        if self.value[2 * v] == 0:
+            heapq.heappush(self.heap, (-activity[v], v))
+
+    def _bump_clause(self, c):
+        c.activity += self.cla_inc
+        if c.activity > 1e20:
+            for lc in self.learnts:
+                lc.activity *= 1e-20
+            self.cla_inc *= 1e-20
+
+    def _rebuild_heap(self):
+        value, activity = self.value, self.activity
+        self.heap = [(-activity[v], v) for v in range(1, self.num_vars + 1)
+                     if value[2 * v] == 0]
+        heapq.heapify(self.heap)
+
+    def _analyze(self, conflict):
+        """First-UIP conflict analysis; returns (learnt lits, backjump level)."""
+        seen, level, reason, trail = self.seen, self.level, self.reason, self.trail
+        dlevel = len(self.trail_lim)
+        learnt = [0]
+        path = 0
+        p = None
+        idx = len(trail) - 1
+        c = conflict
+        while True:
+            if c.learnt:
+                self._bump_clause(c)
+            for q in (c.lits if p is None else c.lits[1:]):
+                v = q >> 1
+                if not seen[v] and level[v] > 0:
+                    seen[v] = True
+                    self._bump_var(v)
+                    if level[v] >= dlevel:
+                        path += 1
+                    else:
+                        learnt.append(q)
+            while not seen[trail[idx] >> 1]:
+                idx -= 1
+            p = trail[idx]
+            idx -= 1
+            c = reason[p >> 1]
+            seen[p >> 1] = False
+            path -= 1
+            if path == 0:
+                break
+        learnt[0] = p ^ 1
+
+        # local minimisation: drop literals implied by the rest of the clause
+        minimized = [learnt[0]]
+        for q in learnt[1:]:
+            r = reason[q >> 1]
+            if r is None or any(not seen[x >> 1] and level[x >> 1] > 0
+                                for x in r.lits[1:]):
+                minimized.append(q)
+        for q in learnt[1:]:
+            seen[q >> 1] = False
+        learnt = minimized
+
+        if len(learnt) == 1:
+            return learnt, 0
+        best = 1
+        for k in range(2, len(learnt)):
+            if level[learnt[k] >> 1] > level[learnt[best] >> 1]:
+                best = k
+        learnt[1], learnt[best] = learnt[best], learnt[1]
+        return learnt, level[learnt[1] >> 1]
+
+    def _lbd(self, lits):
+        level = self.level
+        return len({level[q >> 1] for q in lits})
+
+    def _pick_branch_lit(self):
+        heap, value, activity = self.heap, self.value, self.activity
+        while heap:
+            act, v = heapq.heappop(heap)
+            if value[2 * v] == 0 and -act == activity[v]:
+                self.decisions += 1
+                return 2 * v if self.polarity[v] else 2 * v + 1
+        return None
+
+    def _locked(self, c):
+        v = c.lits[0] >> 1
+        return self.reason[v] is c and self.value[c.lits[0]] == 1
+
+    def _reduce_db(self):
+        """Drop roughly half of the learned clauses, keeping glue clauses."""
+        self.learnts.sort(key=lambda c: (-c.lbd, c.activity))
+        limit = len(self.learnts) // 2
+        kept = []
+        for i, c in enumerate(self.learnts):
+            if i < limit and c.lbd > 2 and len(c.lits) > 2 and not self._locked(c):
+                c.deleted = True
+            else:
+                kept.append(c)
+        self.deleted_learnts += len(self.learnts) - len(kept)
+        self.learnts = kept
+
+    def _analyze_final(self, code):
+        """
+        Assumptions responsible for literal `code` being true: the decisions
+        (all assumptions at this point) it depends on through the trail.
+        """
+        seen, reason, level = self.seen, self.reason, self.level
+        core = [code ^ 1]
+        if not self.trail_lim:
+            return core
+        seen[code >> 1] = True
+        for q in reversed(self.trail[self.trail_lim[0]:]):
+            v = q >> 1
+            if not seen[v]:
+                continue
+            r = reason[v]
+            if r is None:
+                core.append(q)
+            else:
+                for x in r.lits[1:]:
+                    if level[x >> 1] > 0:
+                        seen[x >> 1] = True
+            seen[v] = False
+        seen[code >> 1] = False
+        return core
+
+    def _search(self, conflict_budget):
+        conflicts_here = 0
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts_here += 1
+                if self._decision_level() == 0:
+                    return False
+                learnt, back_level = self._analyze(conflict)
+                self._cancel_until(back_level)
+                if len(learnt) == 1:
+                    self._enqueue(learnt[0], None)
+                else:
+                    c = _Clause(learnt, learnt=True, lbd=self._lbd(learnt))
+                    self._bump_clause(c)
+                    self.learnts.append(c)
+                    self._attach(c)
+                    self._enqueue(learnt[0], c)
+                self.var_inc /= self.VAR_DECAY
+                self.cla_inc /= self.CLAUSE_DECAY
+            else:
+                if conflicts_here >= conflict_budget:
+                    self._cancel_until(0)
+                    return None
+                if len(self.learnts) - len(self.trail) >= self.max_learnts:
+                    self._reduce_db()
+                code = None
+                while self._decision_level() < len(self.assumptions):
+                    p = self.assumptions[self._decision_level()]
+                    if self.value[p] == 1:
+                        self.trail_lim.append(len(self.trail))  # dummy level
+                    elif self.value[p] == -1:
+                        self._core = self._analyze_final(p ^ 1)
+                        return False
+                    else:
+                        code = p
+                        break
+                if code is None:
+                    code = self._pick_branch_lit()
+                    if code is None:
+                        return True
+                self.trail_lim.append(len(self.trail))
+                self._enqueue(code, None)
+
+    def _report(self, stats, since):
+        """Add the counters grown since `since` to stats, returns the new mark."""
+        mark = (self.decisions, self.propagations, self.conflicts, self.deleted_learnts)
+        stats.nodes += mark[0] - since[0]
+        stats.propagations += mark[1] - since[1]
+        stats.conflicts += mark[2] - since[2]
+        if mark[3] != since[3]:
+            stats.prune("learnt_deleted", mark[3] - since[3])
+        stats.tick()
+        return mark
+
+    def solve(self, assumptions=(), stats=None):
+        """
+        Returns True if the clauses added so far are satisfiable with every
+        literal of `assumptions` true. stats (or the active SolverStats) gets
+        the decisions (as nodes), propagations and conflicts of this call,
+        reported at every restart; learned clauses dropped by the clause
+        database reduction count as prunes["learnt_deleted"].
+        """
+        self._model = None
+        self._core = []
+        if not self.ok:
+            return False
+        top = max((abs(lit) for lit in assumptions), default=0)
+        if top > self.num_vars:
+            self.new_var(top - self.num_vars)
+        self.assumptions = [_encode(lit) for lit in assumptions]
+        self.max_learnts = max(len(self.clauses) // 3, 1000)
+        stats = active_stats(stats)
+        mark = (self.decisions, self.propagations, self.conflicts, self.deleted_learnts)
+        restart = 0
+        while True:
+            status = self._search(_luby(restart) * self.RESTART_UNIT)
+            restart += 1
+            if stats is not None:
+                mark = self._report(stats, mark)
+            if status is None:
+                self.max_learnts = int(self.max_learnts * 1.1)
+                continue
+            if status:
+                self._model = {v: self.value[2 * v] == 1
+                               for v in range(1, self.num_vars + 1)}
+            elif not self._core:
+                self.ok = False   # unsatisfiable whatever the assumptions
+            self._cancel_until(0)
+            self.assumptions = []
+            return status
+
+    def model(self):
+        """Satisfying assignment {var: bool} found by the last solve()."""
+        return self._model
+
+    def unsat_core(self):
+        """
+        Assumptions (DIMACS literals) that the last failed solve() found
+        jointly unsatisfiable; [] if it failed without assumptions.
+        """
+        return [_decode(code) for code in self._core]
+
+    def iter_models(self, variables=None):
+        """
+        Yield the models of the formula, distinct on `variables` (default:
+        all variables), blocking each one with a clause. The blocking clauses
+        stay in the solver.
+        """
+        variables = list(range(1, self.num_vars + 1)) if variables is None else list(variables)
+        while self.solve():
+            model = self._model
+            yield model
+            if not self.add_clause([-v if model[v] else v for v in variables]):
+                return
+
+
+def solve_sat_cdcl(formula, num_vars, stats=None):
+    """
+    Drop-in replacement for solve_sat_bruteforce.
+    Args:
+        formula: list of clauses (DIMACS literals)
+        num_vars: number of variables (int)
+        stats: optional SolverStats, see CDCLSolver.solve
+    Returns:
+        dict {var: bool} for 1..num_vars, or None if UNSAT.
+    Literals over variables above num_vars are treated as false, exactly like
+    the brute-force solver which never assigns them.
+    """
+    solver = CDCLSolver(num_vars)
+    for clause in formula:
+        if not solver.add_clause([lit for lit in clause if abs(lit) <= num_vars]):
+            return None
+    if not solver.solve(stats=stats):
+        return None
+    return solver.model()
@@ -0,0 +1,237 @@
+"""
+Projected model counting and enumeration for CNF formulas
+DPLL-style #SAT: unit propagation, then the residual formula is split into
+variable-disjoint components whose counts multiply; each component count
+is cached by its clause set. Only assignments of the projection variables
+are counted: once a component has no projection variable left, it counts 1
+if it is satisfiable and 0 otherwise.
+"""
+from itertools import product
+from typing import Dict, Iterator, Optional
+
+from sat_cdcl import CDCLSolver
+
+
+def _assign(clauses, literals):
+    """
+    Make `literals` true and unit-propagate. Returns (clauses, true literals)
+    or (None, ...) on a conflict. Clauses are tuples of literals.
+    """
+    true = set()
+    pending = set(literals)
+    while pending:
+        if any(-lit in pending for lit in pending) or any(-lit in true for lit in pending):
+            return None, true
+        true |= pending
+        false = {-lit for lit in pending}
+        pending = set()
+        remaining = []
+        for clause in clauses:
+            # clauses kept by the previous rounds only need the new literals
+            if false.isdisjoint(clause):
+                if true.isdisjoint(clause):
+                    remaining.append(clause)
+                continue
+            if not true.isdisjoint(clause):
+                continue
+            rest = tuple(lit for lit in clause if lit not in false)
+            if not rest:
+                return None, true
+            if len(rest) == 1:
+                pending.add(rest[0])
+            else:
+                remaining.append(rest)
+        clauses = remaining
+    return clauses, true
+
+
+def _variables(clauses):
+    return {abs(lit) for clause in clauses for lit in clause}
+
+
+def _components(clauses):
+    """Split clauses into groups sharing no variable (search over occurrences)."""
+    occurs: Dict[int, list] = {}
+    for i, clause in enumerate(clauses):
+        for lit in clause:
+            occurs.setdefault(abs(lit), []).append(i)
+    seen = bytearray(len(clauses))
+    groups = []
+    for i in range(len(clauses)):
+        if seen[i]:
+            continue
+        seen[i] = 1
+        stack = [i]
+        group = []
+        while stack:
+            j = stack.pop()
+            group.append(clauses[j])
+            for lit in clauses[j]:
+                for k in occurs.pop(abs(lit), ()):   # each variable expanded once
+                    if not seen[k]:
+                        seen[k] = 1
+                        stack.append(k)
+        groups.append(group)
+    return groups
+
+
+def _satisfiable(clauses):
+    solver = CDCLSolver()
+    for clause in clauses:
+        if not solver.add_clause(clause):
+            return False
+    return solver.solve()
+
+
+def _literals(true):
+    return sorted(true, key=abs)
+
+
+class ModelCounter:
+    """
+    Usage:
+        counter = ModelCounter(clauses, num_vars, projection=[1, 2, 3])
+        counter.count()            # number of projected models
+        for model in counter.models():
+            ...                    # {var: bool} over the projection
+    The projection defaults to 1..num_vars; other variables occurring in
+    the clauses are existentially quantified.
+    """
+
+    def __init__(self, clauses, num_vars: int, projection=None):
+        self.num_vars = num_vars
+        self.projection = sorted(set(range(1, num_vars + 1) if projection is None
+                                     else projection))
+        self._projected = set(self.projection)
+        self.cache: Dict[frozenset, int] = {}
+        self.clauses = []
+        self._solver = None
+        self.trivially_unsat = False
+        for clause in clauses:
+            lits = tuple(sorted(set(clause), key=abs))
+            if any(-lit in lits for lit in lits):
+                continue  # tautology
+            if not lits:
+                self.trivially_unsat = True
+            self.clauses.append(lits)
+
+    def _units(self):
+        return [clause[0] for clause in self.clauses if len(clause) == 1]
+
+    # ---- counting ----
+
+    def _count(self, clauses, path):
+        """
+        Projected models of a unit-free clause list, over its own variables.
+        `path` holds the literals made true on the way down.
+        """
+        total = 1
+        for component in _components(clauses):
+            key = frozenset(component)
+            count = self.cache.get(key)
+            if count is None:
+                count = self._count_component(component, path)
+                self.cache[key] = count
+            total *= count
+            if not total:
+                return 0
+        return total
+
+    def _component_satisfiable(self, clauses, path):
+        # one incremental solver over the whole formula, queried under the
+        # current path: a model of everything is also a model of the
+        # component; only when that fails is the component checked alone
+        if self._solver is None:
+            self._solver = CDCLSolver()
+            for clause in self.clauses:
+                self._solver.add_clause(clause)
+        if self._solver.solve(_literals(path)):
+            return True
+        return _satisfiable(clauses)
+
+    def _count_component(self, clauses, path):
+        variables = _variables(clauses)
+        projected = variables & self._projected
+        if not projected:
+            return 1 if self._component_satisfiable(clauses, path) else 0
+        # branch on the most frequent projection variable
+        occurrences: Dict[int, int] = {}
+        for clause in clauses:
+            for lit in clause:
+                if abs(lit) in projected:
+                    occurrences[abs(lit)] = occurrences.get(abs(lit), 0) + 1
+        var = max(occurrences, key=occurrences.get)
+        total = 0
+        for lit in (var, -var):
+            rest, true = _assign(clauses, [lit])
+            if rest is None:
+                continue
+            free = projected - {abs(l) for l in true} - _variables(rest)
+            total += self._count(rest, path | true) << len(free)
+        return total
+
+    def count(self) -> int:
+        """Number of assignments of the projection that extend to a model."""
+        if self.trivially_unsat:
+            return 0
+        rest, true = _assign(self.clauses, self._units())
+        if rest is None:
+            return 0
+        free = self._projected - {abs(l) for l in true} - _variables(rest)
+        return self._count(rest, true) << len(free)
+
+    # ---- enumeration ----
+
+    def models(self) -> Iterator[Dict[int, bool]]:
+        """
+        Stream the projected models ({var: bool} over the projection), each
+        exactly once. Branches are pruned with the cached counts, so every
+        branch explored yields at least one model.
+        """
+        if self.trivially_unsat:
+            return
+        rest, true = _assign(self.clauses, self._units())
+        if rest is None or not self._count(rest, true):
+            return
+        yield from self._models(rest, true)
+
+    def _models(self, clauses, true):
+        fixed = {abs(lit): lit > 0 for lit in true if abs(lit) in self._projected}
+        candidates = _variables(clauses) & self._projected
+        if not candidates:
+            free = [v for v in self.projection if v not in fixed]
+            for values in product((False, True), repeat=len(free)):
+                model = dict(fixed)
+                model.update(zip(free, values))
+                yield {v: model[v] for v in self.projection}
+            return
+        var = min(candidates)
+        for lit in (var, -var):
+            rest, implied = _assign(clauses, [lit])
+            if rest is None or not self._count(rest, true | implied):
+                continue
+            yield from self._models(rest, true | implied)
+
+
+def count_models(clauses, num_vars: int, projection=None) -> int:
+    """Number of models projected onto `projection` (default 1..num_vars)."""
+    return ModelCounter(clauses, num_vars, projection).count()
+
+
+def iter_models(clauses, num_vars: int, projection=None) -> Iterator[Dict[int, bool]]:
+    """Generator of the projected models, see ModelCounter.models."""
+    return ModelCounter(clauses, num_vars, projection).models()
+
+
+def same_projected_count(original_clauses, num_original_vars, reduced_clauses,
+                         num_reduced_vars, meta: Optional[dict] = None) -> bool:
+    """
+    True if the reduced formula (sat_3sat / sat_3sat_optimized output) has as
+    many models as the original one once projected onto the original
+    variables. Variables fixed by sat_3sat_optimized (meta["fixed"]) no
+    longer occur in the reduced formula and are left out of the projection.
+    """
+    fixed = meta["fixed"] if meta is not None else {}
+    projection = [v for v in range(1, num_original_vars + 1) if v not in fixed]
+    return (count_models(original_clauses, num_original_vars)
+            == count_models(reduced_clauses, num_reduced_vars, projection))
@@ -0,0 +1,283 @@
+"""
+CNF preprocessing before solving
+Unit propagation, pure-literal elimination, subsumption and self-subsuming
+resolution, bounded variable elimination and failed-literal probing. Every
+step that is not an equivalence pushes (witness literal, clause) entries on a
+reconstruction stack, so a model of the simplified formula can be extended to
+a model of the original one.
+"""
+from sat_cdcl import solve_sat_cdcl
+from solver_stats import active_stats
+
+BVE_MAX_OCCURRENCES = 16   # skip variables with more occurrences per polarity
+BVE_MAX_RESOLVENT = 12     # longest resolvent bounded elimination may add
+PROBE_BUDGET = 2000        # literals tried by failed-literal probing
+
+
+class Preprocessor:
+    """
+    Usage:
+        pre = Preprocessor(formula, num_vars)
+        clauses = pre.simplify()          # None if found UNSAT
+        model = solver(clauses, num_vars)
+        full = pre.extend(model)          # satisfies the original formula
+    """
+
+    def __init__(self, formula, num_vars):
+        self.num_vars = num_vars
+        self.clauses = {}        # clause id -> list of literals
+        self.occ = {}            # literal -> set of clause ids
+        self.value = {}          # var -> bool, fixed at top level
+        self.eliminated = set()  # vars removed by variable elimination
+        self.stack = []          # reconstruction: (witness literal, clause)
+        self.units = []
+        self.ok = True
+        self._next_id = 0
+        for clause in formula:
+            self._add(list(clause))
+
+    # ---- clause database ----
+
+    def _add(self, lits):
+        lits = list(dict.fromkeys(lits))
+        if any(-lit in lits for lit in lits):
+            return None  # tautology
+        kept = []
+        for lit in lits:
+            value = self.value.get(abs(lit))
+            if value is None:
+                kept.append(lit)
+            elif value == (lit > 0):
+                return None  # already satisfied
+        if not kept:
+            self.ok = False
+            return None
+        cid = self._next_id
+        self._next_id += 1
+        self.clauses[cid] = kept
+        for lit in kept:
+            self.occ.setdefault(lit, set()).add(cid)
+        if len(kept) == 1:
+            self.units.append(kept[0])
+        return cid
+
+    def _remove(self, cid):
+        for lit in self.clauses.pop(cid):
+            self.occ[lit].discard(cid)
+
+    def _strengthen(self, cid, lit):
+        """Remove `lit` from clause cid."""
+        lits = self.clauses[cid]
+        lits.remove(lit)
+        self.occ[lit].discard(cid)
+        if not lits:
+            self.ok = False
+        elif len(lits) == 1:
+            self.units.append(lits[0])
+
+    def _occurrences(self, lit):
+        return self.occ.get(lit, ())
+
+    # ---- techniques ----
+
+    def _assign(self, lit):
+        var = abs(lit)
+        if var in self.value:
+            if self.value[var] != (lit > 0):
+                self.ok = False
+            return
+        self.value[var] = lit > 0
+        self.stack.append((lit, (lit,)))
+        for cid in list(self._occurrences(lit)):
+            self._remove(cid)
+        for cid in list(self._occurrences(-lit)):
+            self._strengthen(cid, -lit)
+
+    def propagate(self):
+        """Top-level unit propagation."""
+        while self.units and self.ok:
+            self._assign(self.units.pop())
+        return self.ok
+
+    def pure_literals(self):
+        changed = False
+        for var in range(1, self.num_vars + 1):
+            if var in self.value or var in self.eliminated:
+                continue
+            pos, neg = self._occurrences(var), self._occurrences(-var)
+            if pos and not neg:
+                self._assign(var)
+                changed = True
+            elif neg and not pos:
+                self._assign(-var)
+                changed = True
+        return changed
+
+    def subsume(self):
+        """Backward subsumption and self-subsuming resolution."""
+        changed = False
+        for cid in sorted(self.clauses, key=lambda c: len(self.clauses[c])):
+            if not self.ok:
+                break
+            lits = self.clauses.get(cid)
+            if lits is None:
+                continue
+            as_set = set(lits)
+            pivot = min(lits, key=lambda lit: len(self._occurrences(lit)))
+            for other in list(self._occurrences(pivot)):
+                if other != cid and as_set.issubset(self.clauses[other]):
+                    self._remove(other)
+                    changed = True
+            # (l R) and (-l R S)  ->  (-l R S) becomes (R S)
+            for lit in lits:
+                rest = as_set - {lit}
+                for other in list(self._occurrences(-lit)):
+                    if other in self.clauses and rest.issubset(self.clauses[other]):
+                        self._strengthen(other, -lit)
+                        changed = True
+        return changed
+
+    def _resolvents(self, var, pos, neg):
+        """Non-tautological resolvents on var, or None if over the bounds."""
+        resolvents = []
+        limit = len(pos) + len(neg)
+        for p in pos:
+            for q in neg:
+                merged = (set(self.clauses[p]) | set(self.clauses[q])) - {var, -var}
+                if any(-lit in merged for lit in merged):
+                    continue
+                if len(merged) > BVE_MAX_RESOLVENT or len(resolvents) == limit:
+                    return None
+                resolvents.append(sorted(merged, key=abs))
+        return resolvents
+
+    def eliminate(self):
+        """Bounded variable elimination: replace the clauses of x by their
+        resolvents on x when that does not increase the clause count."""
+        changed = False
+        candidates = sorted(
+            (var for var in range(1, self.num_vars + 1)
+             if var not in self.value and var not in self.eliminated),
+            key=lambda v: len(self._occurrences(v)) * len(self._occurrences(-v)))
+        for var in candidates:
+            if not self.ok:
+                break
+            pos, neg = list(self._occurrences(var)), list(self._occurrences(-var))
+            if not pos or not neg or len(pos) > BVE_MAX_OCCURRENCES \
+                    or len(neg) > BVE_MAX_OCCURRENCES:
+                continue
+            resolvents = self._resolvents(var, pos, neg)
+            if resolvents is None:
+                continue
+            # replayed backwards: x = False, then x = True if a clause needs it
+            for p in pos:
+                self.stack.append((var, tuple(self.clauses[p])))
+            self.stack.append((-var, (-var,)))
+            for cid in pos + neg:
+                self._remove(cid)
+            for resolvent in resolvents:
+                self._add(resolvent)
+            self.eliminated.add(var)
+            changed = True
+        return changed
+
+    def _probe(self, lit):
+        """True if assigning `lit` propagates to a conflict."""
+        assigned = {lit}
+        queue = [lit]
+        while queue:
+            current = queue.pop()
+            for cid in self._occurrences(-current):
+                free = None
+                for other in self.clauses[cid]:
+                    if other in assigned:
+                        break
+                    if -other not in assigned:
+                        if free is not None:
+                            break
+                        free = other
+                else:
+                    if free is None:
+                        return True
+                    assigned.add(free)
+                    queue.append(free)
+        return False
+
+    def probe(self):
+        """Failed-literal probing on variables of binary clauses."""
+        changed = False
+        budget = PROBE_BUDGET
+        variables = {abs(lit) for lits in self.clauses.values() if len(lits) == 2
+                     for lit in lits}
+        for var in sorted(variables):
+            for lit in (var, -var):
+                if budget == 0 or not self.ok:
+                    return changed
+                if var in self.value:
+                    break
+                budget -= 1
+                if self._probe(lit):
+                    self.units.append(-lit)
+                    self.propagate()
+                    changed = True
+        return changed
+
+    # ---- driver ----
+
+    def simplify(self, max_rounds=10):
+        """Run every technique to a fixpoint; returns the clauses or None."""
+        for _ in range(max_rounds):
+            if not self.propagate():
+                return None
+            changed = self.pure_literals()
+            changed |= self.subsume()
+            if not self.propagate():
+                return None
+            changed |= self.eliminate()
+            if not self.propagate():
+                return None
+            changed |= self.probe()
+            if not self.ok:
+                return None
+            if not changed:
+                break
+        return [list(lits) for lits in self.clauses.values()]
+
+    def extend(self, model):
+        """
+        Extend a model of the simplified formula to all 1..num_vars,
+        replaying the reconstruction stack backwards.
+        """
+        full = {var: bool(model.get(var, False)) for var in range(1, self.num_vars + 1)}
+        for witness, clause in reversed(self.stack):
+            if not any(full.get(abs(lit), False) == (lit > 0) for lit in clause):
+                full[abs(witness)] = witness > 0
+        return full
+
+
+def solve_sat_preprocessed(formula, num_vars, solver=solve_sat_cdcl, stats=None):
+    """
+    Preprocess, solve the simplified formula with `solver` (same signature
+    as solve_sat_bruteforce) and map the model back.
+    Literals over variables above num_vars are treated as false, as in
+    solve_sat_bruteforce.
+    stats (or the active SolverStats) gets the clauses and variables removed
+    by preprocessing as prunes, and is active while `solver` runs.
+    """
+    pre = Preprocessor([[lit for lit in clause if abs(lit) <= num_vars]
+                        for clause in formula], num_vars)
+    clauses = pre.simplify()
+    stats = active_stats(stats)
+    if stats is not None:
+        stats.prune("preprocess_clause", len(formula) - len(clauses or ()))
+        stats.prune("preprocess_var", len(pre.value) + len(pre.eliminated))
+    if clauses is None:
+        return None
+    if stats is None:
+        model = solver(clauses, num_vars)
+    else:
+        with stats:
+            model = solver(clauses, num_vars)
+    if model is None:
+        return None
+    return pre.extend(model)
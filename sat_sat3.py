@@ -1,12 +1,32 @@
-from read_write_files import write_dimacs
+from read_write_files import (iter_dimacs_clauses, read_dimacs_header, write_dimacs,
+                              write_dimacs_stream)
 from sat import verify_sat
 
 # SAT -> 3-SAT
-def sat_3sat(clauses,aux_start=1):
-    new_clauses=[]
-    aux = aux_start
-    for clause in clauses:
+class Sat3Reducer:
+    """
+    Clause-at-a-time SAT -> 3-SAT reduction. The auxiliary-variable counter
+    lives in the object, so clauses can be streamed through reduce() and
+    num_vars read once the stream is exhausted.
+    """
+
+    def __init__(self, aux_start=1):
+        self.aux = aux_start
+
+    @property
+    def num_vars(self):
+        """Highest variable used so far (aux_start - 1 + auxiliaries)."""
+        return self.aux - 1
+
+    def reduce_clause(self, clause):
+        new_clauses = []
+        aux = self.aux
         n = len(clause)
+        if n == 0:
+            # the empty clause is false: y and -y, each padded to 3 literals
+            y = aux
+            self.aux = aux + 1
+            return self.reduce_clause([y]) + self.reduce_clause([-y])
         if n == 3:
             new_clauses.append(clause)
         elif n==1:
@@ -33,7 +53,139 @@ def sat_3sat(clauses,aux_start=1):
                 curr = literals[i]
                 aux+=1
             new_clauses.append([prev,curr,literals[-1]])
-    return (aux-1),new_clauses
+        self.aux = aux
+        return new_clauses
+
+    def reduce(self, clauses):
+        """Yield the reduced clauses of any clause iterable, one at a time."""
+        for clause in clauses:
+            yield from self.reduce_clause(clause)
+
+
+def sat_3sat(clauses,aux_start=1):
+    reducer = Sat3Reducer(aux_start)
+    new_clauses = list(reducer.reduce(clauses))
+    return reducer.num_vars,new_clauses
+
+
+def sat_3sat_file(input_path, output_path):
+    """
+    Streaming SAT -> 3-SAT from one DIMACS file to another: clauses flow
+    from the reader through the reducer to the writer, whose header is
+    backpatched at the end, so memory stays constant.
+    Returns (num_variables, num_clauses) of the reduced formula.
+    Without a `p cnf` header, a first pass over the file finds the largest
+    variable so the auxiliary variables start above it.
+    """
+    header = read_dimacs_header(input_path)
+    if header is not None:
+        num_vars = header[0]
+    else:
+        num_vars = max((abs(lit) for clause in iter_dimacs_clauses(input_path)
+                        for lit in clause), default=0)
+    reducer = Sat3Reducer(num_vars + 1)
+    return write_dimacs_stream(output_path, lambda: reducer.num_vars,
+                               reducer.reduce(iter_dimacs_clauses(input_path)))
+
+# SAT -> 3-SAT, optimized encoding
+def _simplify_clauses(clauses):
+    """
+    Deduplicate literals, drop tautologies, run unit propagation and remove
+    subsumed clauses. Returns (clauses, fixed {var: bool}, unsat flag).
+    """
+    alive = {}
+    for clause in clauses:
+        lits = list(dict.fromkeys(clause))
+        if not lits:
+            return [], {}, True
+        if any(-lit in lits for lit in lits):
+            continue  # tautology
+        alive[len(alive)] = lits
+    occurrences = {}
+    for cid, lits in alive.items():
+        for lit in lits:
+            occurrences.setdefault(lit, set()).add(cid)
+
+    def remove(cid):
+        for lit in alive.pop(cid):
+            occurrences[lit].discard(cid)
+
+    # unit propagation
+    fixed = {}
+    units = [lits[0] for lits in alive.values() if len(lits) == 1]
+    while units:
+        lit = units.pop()
+        var, value = abs(lit), lit > 0
+        if var in fixed:
+            if fixed[var] != value:
+                return [], fixed, True
+            continue
+        fixed[var] = value
+        for cid in list(occurrences.get(lit, ())):
+            remove(cid)
+        for cid in list(occurrences.get(-lit, ())):
+            lits = alive[cid]
+            lits.remove(-lit)
+            occurrences[-lit].discard(cid)
+            if not lits:
+                return [], fixed, True
+            if len(lits) == 1:
+                units.append(lits[0])
+
+    # backward subsumption, shortest clauses first
+    for cid in sorted(alive, key=lambda c: len(alive[c])):
+        if cid not in alive:
+            continue
+        lits = alive[cid]
+        pivot = min(lits, key=lambda lit: len(occurrences[lit]))
+        as_set = set(lits)
+        for other in list(occurrences[pivot]):
+            if other != cid and len(alive[other]) >= len(lits) \
+                    and as_set.issubset(alive[other]):
+                remove(other)
+
+    return list(alive.values()), fixed, False
+
+
+def sat_3sat_optimized(clauses, num_vars):
+    """
+    Smaller SAT -> 3-SAT reduction.
+      - literals deduplicated, tautologies dropped, unit propagation and
+        subsumption applied first;
+      - short clauses are padded with shared auxiliaries f, g, h forced to
+        False once by 7 clauses: (l) -> (l f g), (a b) -> (a b f);
+      - long clauses are split as in sat_3sat.
+    Returns (num_vars_total, new_clauses, meta); pass meta to
+    project_assignment to recover an assignment of the original formula.
+    """
+    simplified, fixed, unsat = _simplify_clauses(clauses)
+    meta = {"num_original_vars": num_vars, "fixed": fixed, "false_vars": []}
+    reducer = Sat3Reducer(num_vars + 1)
+    new_clauses = []
+
+    if unsat or any(len(clause) < 3 for clause in simplified):
+        f, g, h = reducer.aux, reducer.aux + 1, reducer.aux + 2
+        reducer.aux += 3
+        meta["false_vars"] = [f, g, h]
+        # every sign pattern but (f g h): only f = g = h = False survives
+        for sf in (1, -1):
+            for sg in (1, -1):
+                for sh in (1, -1):
+                    if (sf, sg, sh) != (1, 1, 1):
+                        new_clauses.append([sf * f, sg * g, sh * h])
+        if unsat:
+            new_clauses.append([f, g, h])
+            return reducer.num_vars, new_clauses, meta
+
+    for clause in simplified:
+        if len(clause) == 1:
+            new_clauses.append([clause[0], f, g])
+        elif len(clause) == 2:
+            new_clauses.append([clause[0], clause[1], f])
+        else:
+            new_clauses.extend(reducer.reduce_clause(clause))
+    return reducer.num_vars, new_clauses, meta
+
 
 #MAPPING VERIFIER (3-SAT -> SAT)
 
@@ -42,11 +194,13 @@ def verify_projection_preserves_satisfiability(
     original_clauses,
     reduced_clauses,
     assignment_reduced,
-    num_original_vars
+    num_original_vars,
+    meta=None
 ):
     """
     Verifies that projecting a satisfying assignment of the 3SAT formula
-    gives a satisfying assignment of the original SAT formula."""
+    gives a satisfying assignment of the original SAT formula.
+    meta: as returned by sat_3sat_optimized, None for sat_3sat."""
     
 
     # Step 1: check assignment satisfies reduced 3SAT formula
@@ -54,18 +208,23 @@ def verify_projection_preserves_satisfiability(
         raise ValueError("Assignment does NOT satisfy the reduced 3SAT formula")
 
     # Step 2: project to original variables
-    projected = project_assignment(assignment_reduced, num_original_vars)
+    projected = project_assignment(assignment_reduced, num_original_vars, meta)
 
     # Step 3: check projected assignment satisfies original SAT
     return verify_sat(original_clauses, projected)
 
 
-def project_assignment(assignment, num_original_vars):
+def project_assignment(assignment, num_original_vars, meta=None):
     """
     Keep only assignments for original variables (1..num_original_vars)
+    With the meta of sat_3sat_optimized, variables fixed by unit
+    propagation during the reduction get their forced value back.
     """
-    return {
+    projected = {
         var: value
         for var, value in assignment.items()
         if 1 <= var <= num_original_vars
     }
+    if meta is not None:
+        projected.update(meta["fixed"])
+    return projected
@@ -1,54 +1,105 @@
 from read_write_files import write_subsetsum_instance
+from subsetsum import mask_to_subset, subset_to_binary
 
-def sat_to_subsetsum_base2(clauses, num_vars):
+class SparseNumber:
+    """
+    Number written in `base` with `width` digits, stored as its non-zero
+    (column, digit) pairs; column 0 is the most significant digit.
+    The integer value is only built (and cached) when int() is called.
+    """
+    __slots__ = ("columns", "width", "base", "_value")
+
+    def __init__(self, columns, width, base=4):
+        self.columns = tuple(columns)
+        self.width = width
+        self.base = base
+        self._value = None
+
+    def digits(self):
+        digits = [0] * self.width
+        for column, digit in self.columns:
+            digits[column] = digit
+        return digits
+
+    def __int__(self):
+        if self._value is None:
+            base = self.base
+            if base & (base - 1) == 0 and base <= 16:
+                # power-of-two base: int() parses it in linear time
+                text = bytearray(b"0" * self.width)
+                for column, digit in self.columns:
+                    text[column] = ord("0123456789abcdef"[digit])
+                self._value = int(text, base) if self.width else 0
+            else:
+                self._value = sum(digit * base ** (self.width - 1 - column)
+                                  for column, digit in self.columns)
+        return self._value
+
+    __index__ = __int__
+
+    def __eq__(self, other):
+        return int(self) == int(other)
+
+    def __hash__(self):
+        return hash(int(self))
+
+    def __repr__(self):
+        return f"SparseNumber({list(self.columns)}, width={self.width}, base={self.base})"
+
+
+def sat_to_subsetsum_sparse(clauses, num_vars, base=4):
+    """
+    Same reduction as sat_to_subsetsum_base2, but every number is a
+    SparseNumber and the literal -> clause occurrences are indexed in one
+    pass over the formula, instead of testing `lit in clause` for every
+    variable x clause pair.
+    Returns (numbers, target, meta) with the same meta layout.
+    """
     m = len(clauses)
-    base = 4
     width = num_vars + m
-    
+
+    occurrences = {}
+    for j, clause in enumerate(clauses):
+        for lit in set(clause):
+            occurrences.setdefault(lit, []).append(j)
+
     numbers = []
     meta = {"var_pos": {}, "clause_fillers": [[] for _ in range(m)]}
-    
-    def make_number(digits):
-        value = 0
-        for d in digits:
-            value = value * base + d
-        return value
-    
     for i in range(1, num_vars + 1):
         for sign in [True, False]:
-            digits = [0] * width
-            digits[i - 1] = 1 
-            for j, clause in enumerate(clauses):
-                lit = i if sign else -i
-                if lit in clause:
-                    digits[num_vars + j] = 1 
-            number = make_number(digits)
+            lit = i if sign else -i
+            columns = [(i - 1, 1)] + [(num_vars + j, 1) for j in occurrences.get(lit, ())]
             meta["var_pos"][(i, sign)] = len(numbers)
-            numbers.append(number)
-    
-    # Clause filler numbers
+            numbers.append(SparseNumber(columns, width, base))
+
+    # Clause filler numbers: 3 per clause, picked dynamically later
     for j in range(m):
-        digits = [0] * width
-        digits[num_vars + j] = 1
-        # add 3 fillers per clause, but we'll pick dynamically later
+        filler = [(num_vars + j, 1)]
         for _ in range(3):
             meta["clause_fillers"][j].append(len(numbers))
-            numbers.append(make_number(digits))
-    
+            numbers.append(SparseNumber(filler, width, base))
+
     # Target digits: variable columns = 1, clause columns = 3
-    target_digits = [1]*num_vars + [3]*m
-    target = make_number(target_digits)
-    
+    target = SparseNumber([(c, 1) for c in range(num_vars)]
+                          + [(num_vars + j, 3) for j in range(m)], width, base)
     return numbers, target, meta
 
 
-def sat_solution_to_subset(assignment, numbers, meta, clauses):
-    subset = []
+def sat_to_subsetsum_base2(clauses, num_vars):
+    numbers, target, meta = sat_to_subsetsum_sparse(clauses, num_vars)
+    return [int(number) for number in numbers], int(target), meta
+
+
+def sat_solution_to_mask(assignment, meta, clauses):
+    """
+    Index bitmask over the reduction numbers of the subset encoding a
+    satisfying assignment (same choice as sat_solution_to_subset).
+    """
+    mask = 0
     
     # pick exactly one literal per variable
     for var, value in assignment.items():
-        idx = meta["var_pos"][(var, value)]
-        subset.append(numbers[idx])
+        mask |= 1 << meta["var_pos"][(var, value)]
     
     # add clause fillers carefully
     for j, clause in enumerate(clauses):
@@ -62,23 +113,18 @@ def sat_solution_to_subset(assignment, numbers, meta, clauses):
             continue  # do NOT add any fillers
         # add exactly enough fillers to reach target
         num_fillers_needed = 3 - true_literals
-        subset += [numbers[idx] for idx in meta["clause_fillers"][j][:num_fillers_needed]]
+        for idx in meta["clause_fillers"][j][:num_fillers_needed]:
+            mask |= 1 << idx
     
-    return subset
+    return mask
+
+
+def sat_solution_to_subset(assignment, numbers, meta, clauses):
+    return mask_to_subset(numbers, sat_solution_to_mask(assignment, meta, clauses))
 
 def subset_to_binary_solution(subset, weights):
     """
     Convert a chosen subset (list of numbers) into a binary vector over weights.
-    Works even if weights have duplicates.
+    Works even if weights have duplicates (O(n), see values_to_mask).
     """
-    subset_copy = subset[:]
-    solution = []
-
-    for w in weights:
-        if w in subset_copy:
-            solution.append(1)
-            subset_copy.remove(w)
-        else:
-            solution.append(0)
-
-    return solution
+    return subset_to_binary(weights, subset)
@@ -0,0 +1,125 @@
+"""
+Search statistics for the SAT / SUBSETSUM solvers
+Solvers take an optional `stats` argument; without one they look for the
+innermost SolverStats opened with `with`, so code that calls them
+indirectly (subsets, portfolio engines, benchmarks) can be measured too.
+Without either, nothing is counted: solvers resolve the stats object once
+per call and only touch it when it is not None.
+
+    stats = SolverStats(progress=print, interval=1.0)
+    dp_subset_sum_mask(nums, target, stats=stats)
+
+    with SolverStats() as stats:
+        subsets(nums, target)
+    stats.as_dict()
+"""
+import time
+from collections import Counter
+from typing import Callable, List, Optional
+
+PROGRESS_SECONDS = 1.0     # default period of the progress callback
+
+_active: List["SolverStats"] = []
+
+
+class SolverStats:
+    """
+    Counters filled in by the solvers:
+        nodes              search nodes / assignments / decisions visited
+        prunes             Counter reason -> branches cut
+        propagations       literals propagated (CDCL)
+        conflicts          conflicts analysed (CDCL)
+        dp_cells           DP table cells (or sum-list entries) computed
+        peak_table_bytes   largest estimated size of the tables alive at once
+    progress(stats), if given, is called at most every `interval` seconds
+    from the solvers' polling points.
+    """
+
+    def __init__(self, progress: Optional[Callable[["SolverStats"], None]] = None,
+                 interval: float = PROGRESS_SECONDS):
+        self.nodes = 0
+        self.prunes = Counter()
+        self.propagations = 0
+        self.conflicts = 0
+        self.dp_cells = 0
+        self.peak_table_bytes = 0
+        self.progress = progress
+        self.interval = interval
+        self.started = time.perf_counter()
+        self._last = self.started
+
+    def prune(self, reason: str, count: int = 1):
+        if count > 0:
+            self.prunes[reason] += count
+
+    def table(self, nbytes: int):
+        """Report the size of the tables alive now."""
+        if nbytes > self.peak_table_bytes:
+            self.peak_table_bytes = nbytes
+
+    def tick(self):
+        """Called by the solvers while they run: fires the progress callback."""
+        if self.progress is None:
+            return
+        now = time.perf_counter()
+        if now - self._last >= self.interval:
+            self._last = now
+            self.progress(self)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def as_dict(self) -> dict:
+        return {
+            "nodes": self.nodes,
+            "prunes": dict(self.prunes),
+            "propagations": self.propagations,
+            "conflicts": self.conflicts,
+            "dp_cells": self.dp_cells,
+            "peak_table_bytes": self.peak_table_bytes,
+        }
+
+    def summary(self) -> str:
+        """Non-zero counters on one line."""
+        parts = [f"{name}={value}" for name, value in self.as_dict().items()
+                 if value and name != "prunes"]
+        parts += [f"pruned[{reason}]={count}" for reason, count in sorted(self.prunes.items())]
+        return " ".join(parts)
+
+    def __enter__(self):
+        _active.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        _active.remove(self)
+        return False
+
+    def __repr__(self):
+        return f"SolverStats({self.summary()})"
+
+
+def active_stats(stats: Optional[SolverStats] = None) -> Optional[SolverStats]:
+    """`stats` if given, else the innermost SolverStats used as a context, else None."""
+    if stats is not None:
+        return stats
+    return _active[-1] if _active else None
+
+
+def counted(iterable, stats: SolverStats, weight: int = 1, every: int = 4096):
+    """
+    Yield the items of `iterable`, adding `weight` nodes per item to stats
+    (in batches of `every` items, with a tick after each batch). Lets a
+    solver count the iterations of a loop it does not otherwise touch.
+    """
+    pending = 0
+    try:
+        for item in iterable:
+            pending += 1
+            if pending == every:
+                stats.nodes += pending * weight
+                pending = 0
+                stats.tick()
+            yield item
+    finally:
+        stats.nodes += pending * weight
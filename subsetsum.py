@@ -1,79 +1,302 @@
-from typing import List
+from collections import Counter
+from itertools import combinations, product
+from typing import Iterator, List, Optional, Tuple
+
+from solver_stats import SolverStats, active_stats
 
 #subset solver
-def subsets( nums: List[int], target: int) -> List[List[int]]:
-        res = []
+def _weight_groups(nums: List[int]) -> List[Tuple[int, List[int]]]:
+        """Equal weights grouped as (value, indices), largest value first."""
+        by_value = {}
+        for i, num in enumerate(nums):
+            by_value.setdefault(num, []).append(i)
+        return sorted(by_value.items(), reverse=True)
+
+
+def _count_range(value: int, need: int, low: int, high: int, size: int):
+        """
+        Counts c in [0, size] such that low <= need - c * value <= high, i.e.
+        the groups left after this one can still close the gap.
+        """
+        if value == 0:
+            return range(size + 1) if low <= need <= high else range(0)
+        if value > 0:
+            first, last = -((high - need) // value), (need - low) // value
+        else:
+            first, last = -((need - low) // -value), (high - need) // -value
+        return range(max(first, 0), min(last, size) + 1)
+
 
-        def backtrack(index: int, current_sum: int, current_subset: List[int]):
-            if current_sum == target:
-                res.append(current_subset[:])
-                return
+def _group_expansions(multi_groups, mask: int) -> Iterator[int]:
+        """
+        All index masks with the same per-group counts as `mask`;
+        multi_groups lists (group mask, indices) for groups of 2+ equal weights.
+        """
+        parts = []
+        for group_mask, indices in multi_groups:
+            count = (mask & group_mask).bit_count()
+            if 0 < count < len(indices):
+                mask &= ~group_mask
+                parts.append([sum(1 << i for i in chosen)
+                              for chosen in combinations(indices, count)])
+        for chosen in product(*parts):
+            yield mask | sum(chosen)
+
+
+class _GroupSearch:
+        """
+        Search tree of iter_subsets. A state (g, current_sum, mask) has decided
+        how many copies of each of the first g weight groups are taken; the
+        root is (0, 0, 0). Exposed so the search can be split into subtrees.
+        """
 
-            if current_sum > target or index == len(nums):
-                return
+        POLL_INTERVAL = 4096   # nodes between two should_stop() checks
 
-            current_subset.append(nums[index])
-            backtrack(index + 1, current_sum + nums[index], current_subset)
+        def __init__(self, nums: List[int], target: int):
+            self.target = target
+            self.groups = groups = _weight_groups(nums)
+            count = len(groups)
+            # suffix_low[g] / suffix_high[g]: min / max sum reachable with groups g..
+            self.suffix_low = suffix_low = [0] * (count + 1)
+            self.suffix_high = suffix_high = [0] * (count + 1)
+            for g in range(count - 1, -1, -1):
+                value, indices = groups[g]
+                total = value * len(indices)
+                suffix_low[g] = suffix_low[g + 1] + min(total, 0)
+                suffix_high[g] = suffix_high[g + 1] + max(total, 0)
+            # prefix_masks[g][c]: mask of the first c indices of group g
+            self.prefix_masks = []
+            for _, indices in groups:
+                masks = [0]
+                for i in indices:
+                    masks.append(masks[-1] | (1 << i))
+                self.prefix_masks.append(masks)
+            self.multi_groups = [(masks[-1], indices) for masks, (_, indices)
+                                 in zip(self.prefix_masks, groups) if len(indices) > 1]
 
-            current_subset.pop()
-            backtrack(index + 1, current_sum, current_subset)
+        def roots(self) -> List[Tuple[int, int, int]]:
+            if not self.suffix_low[0] <= self.target <= self.suffix_high[0]:
+                return []
+            return [(0, 0, 0)]
 
-        backtrack(0, 0, [])
-        return res
+        def is_leaf(self, state) -> bool:
+            return state[0] == len(self.groups)
+
+        def children(self, state) -> List[Tuple[int, int, int]]:
+            """Feasible child states, in the order they should be explored."""
+            g, current_sum, mask = state
+            value, indices = self.groups[g]
+            choices = _count_range(value, self.target - current_sum,
+                                   self.suffix_low[g + 1], self.suffix_high[g + 1],
+                                   len(indices))
+            masks = self.prefix_masks[g]
+            return [(g + 1, current_sum + c * value, mask | masks[c]) for c in choices]
+
+        def run(self, states, distinct: bool = False, should_stop=None,
+                stats: Optional[SolverStats] = None) -> Iterator[int]:
+            """
+            Depth-first enumeration of the subtrees below `states`.
+            should_stop, if given, is polled every POLL_INTERVAL nodes.
+            stats (or the active SolverStats) gets the nodes visited and the
+            children cut by the suffix bounds (prunes["bound"]).
+            """
+            groups, count, target = self.groups, len(self.groups), self.target
+            suffix_low, suffix_high = self.suffix_low, self.suffix_high
+            prefix_masks, multi_groups = self.prefix_masks, self.multi_groups
+            stats = active_stats(stats)
+            polled = should_stop is not None or stats is not None
+            poll = self.POLL_INTERVAL
+            stack = list(reversed(states))
+            nodes = 0
+            try:
+                while stack:
+                    nodes += 1
+                    if polled and nodes % poll == 0:
+                        if stats is not None:
+                            stats.nodes += poll
+                            stats.tick()
+                        if should_stop is not None and should_stop():
+                            return
+                    g, current_sum, mask = stack.pop()
+                    if g == count:
+                        if distinct or not multi_groups:
+                            yield mask
+                        else:
+                            yield from _group_expansions(multi_groups, mask)
+                        continue
+                    value, indices = groups[g]
+                    choices = _count_range(value, target - current_sum,
+                                           suffix_low[g + 1], suffix_high[g + 1], len(indices))
+                    if stats is not None and len(choices) <= len(indices):
+                        stats.prune("bound", len(indices) + 1 - len(choices))
+                    masks = prefix_masks[g]
+                    for c in reversed(choices):
+                        stack.append((g + 1, current_sum + c * value, mask | masks[c]))
+            finally:
+                if stats is not None:
+                    stats.nodes += nodes % poll
+
+
+def iter_subsets(nums: List[int], target: int, distinct: bool = False,
+                 stats: Optional[SolverStats] = None) -> Iterator[int]:
+        """
+        Iterative backtracking enumerator, yields solutions as index bitmasks
+        (bit i set <-> nums[i] taken).
+
+        Equal weights are branched on as one group ("take c copies"), so the
+        search never explores the same multiset twice. distinct=True yields one
+        mask per distinct multiset of values; otherwise every index subset is
+        expanded from it. Suffix sums of the negative and positive weights left
+        bound what the remaining groups can add, which prunes correctly for
+        negative weights too. The explicit stack has no recursion limit.
+        The active SolverStats is looked up when iteration starts.
+        """
+        search = _GroupSearch(nums, target)
+        return search.run(search.roots(), distinct, stats=stats)
+
+
+def subsets( nums: List[int], target: int,
+             stats: Optional[SolverStats] = None) -> List[List[int]]:
+        """All subsets (values, in input order) summing to target."""
+        return [mask_to_subset(nums, mask) for mask in iter_subsets(nums, target, stats=stats)]
 
 
 #subset dp solver
-def dp_subset_sum_one(nums: List[int], target: int) -> List[int]:
+def _reachable_sums(nums: List[int], indices: List[int], target: int) -> int:
         """
-        Bottom-up DP that returns one subset (values) summing to target, or [] if none.
-        Assumes non-negative targets.
+        Bitset of the sums in [0, target] reachable with nums[indices]:
+        bit s is set iff some subset sums to s.
         """
-        n = len(nums)
-        if target < 0:
+        mask = (1 << (target + 1)) - 1
+        reach = 1
+        for i in indices:
+            val = nums[i]
+            if 0 < val <= target:
+                reach |= (reach << val) & mask
+        return reach
+
+
+def _bitset_witness(nums: List[int], indices: List[int], target: int,
+                    stats: Optional[SolverStats] = None):
+        """
+        Indices (subset of `indices`) of items summing to target, or None.
+        Hirschberg-style divide and conquer: split the items in two halves,
+        find a split s of the target reachable by both halves from their
+        bitsets, then recurse. Only O(target) bits are alive at any time.
+        """
+        if target == 0:
             return []
+        if len(indices) == 1:
+            return list(indices) if nums[indices[0]] == target else None
 
-        dp = [[False] * (target + 1) for _ in range(n + 1)]
-        dp[0][0] = True
+        if stats is not None:
+            # one bitset row per item, four target-wide bitsets alive below
+            stats.nodes += 1
+            stats.dp_cells += len(indices) * (target + 1)
+            stats.table(4 * ((target + 8) // 8))
+            stats.tick()
+        mid = len(indices) // 2
+        left, right = indices[:mid], indices[mid:]
+        reach_left = _reachable_sums(nums, left, target)
+        reach_right = _reachable_sums(nums, right, target)
+        # reverse the right bitset so that bit s stands for sum target - s
+        mirrored = int(format(reach_right, f"0{target + 1}b")[::-1], 2)
+        splits = reach_left & mirrored
+        del reach_left, reach_right, mirrored
+        if not splits:
+            return None
+        s = (splits & -splits).bit_length() - 1
+        return (_bitset_witness(nums, left, s, stats)
+                + _bitset_witness(nums, right, target - s, stats))
 
-        for i in range(1, n + 1):
-            val = nums[i - 1]
-            for s in range(target + 1):
-                dp[i][s] = dp[i - 1][s] or (s >= val and dp[i - 1][s - val])
 
-        if not dp[n][target]:
+def dp_subset_sum_one(nums: List[int], target: int) -> List[int]:
+        """
+        DP that returns one subset (values) summing to target, or [] if none.
+        Assumes non-negative weights and targets.
+
+        Reachable sums are kept as one big-integer bitset updated with
+        reach |= reach << w, and the witness is rebuilt by divide and conquer,
+        so memory is O(target) bits instead of an (n+1) x (target+1) table.
+        """
+        mask = dp_subset_sum_mask(nums, target)
+        if not mask:
             return []
+        return mask_to_subset(nums, mask)
+
 
-        subset: List[int] = []
-        i, s = n, target
-        while i > 0 and s >= 0:
-            val = nums[i - 1]
-            if s >= val and dp[i - 1][s - val]:
-                subset.append(val)
-                s -= val
-            i -= 1
-        subset.reverse()
-        return subset
+def dp_subset_sum_mask(nums: List[int], target: int,
+                       stats: Optional[SolverStats] = None) -> Optional[int]:
+        """Same DP as dp_subset_sum_one, returns an index bitmask or None."""
+        if target < 0 or not nums:
+            return 0 if target == 0 else None
+        indices = _bitset_witness(nums, list(range(len(nums))), target, active_stats(stats))
+        if indices is None:
+            return None
+        return sum(1 << i for i in indices)
 #subset verifier
+def mask_to_subset(nums: List[int], mask: int) -> List[int]:
+    """Values selected by an index bitmask (bit i <-> nums[i])."""
+    return [num for i, num in enumerate(nums) if mask >> i & 1]
+
+
+def values_to_mask(nums: List[int], subset: List[int]) -> int:
+    """
+    Index bitmask of a subset given by values, in O(n). Multiset-aware:
+    a value taken k times selects its first k occurrences in nums.
+    """
+    remaining = Counter(subset)
+    mask = 0
+    for i, num in enumerate(nums):
+        if remaining[num]:
+            remaining[num] -= 1
+            mask |= 1 << i
+    return mask
+
+
+def mask_to_binary(mask: int, n: int) -> List[int]:
+    """0/1 list of length n, element i = bit i of mask."""
+    return list(mask_to_selection(mask, n))
+
+
+def mask_to_selection(mask: int, n: int) -> bytearray:
+    """bytearray selection vector (one byte 0/1 per weight)."""
+    return bytearray(mask_to_bitstring(mask, n).encode()).translate(_ASCII_TO_BIT)
+
+
+def mask_to_bitstring(mask: int, n: int) -> str:
+    """'0'/'1' string of length n, character i = bit i of mask."""
+    return format(mask, f"0{n}b")[::-1][:n]
+
+
+_ASCII_TO_BIT = bytes.maketrans(b"01", b"\x00\x01")
+
+
 def subset_to_binary(nums, subset):
-    subset_set = set(subset)
-    return [1 if num in subset_set else 0 for num in nums]
+    """0/1 vector over nums of a subset given by values (duplicates counted)."""
+    return mask_to_binary(values_to_mask(nums, subset), len(nums))
 
 
 def verify_against_known_solutions(nums: List[int], target: int,
                                    solutions: List[List[int]],
                                    known_solutions_01: List[str]) -> bool:
-    
-    ok = True
-
-    # 1) Check each found subset sums to target
-    for i, subset in enumerate(solutions):
-        s = sum(subset)
-        if s != target:
-            print(f"[ERROR] Solution #{i} has wrong sum: {subset} (sum={s}, target={target})")
-            ok = False
-
-    # 2) Convert backtracking solutions to 0/1 strings
-    found_01 = []
-    for subset in solutions:
-        bits = subset_to_binary(nums, subset)
-        found_01.append("".join(str(b) for b in bits))
+    """
+    Check found subsets (lists of values) against the target and the official
+    solutions, print what is wrong and return True if everything matches.
+    See subsetsum_verify.verify_solutions for the structured report.
+    """
+    from subsetsum_verify import verify_solutions
+
+    masks = [values_to_mask(nums, subset) for subset in solutions]
+    report = verify_solutions(nums, target, masks, known_solutions_01)
+
+    for i, s in report.invalid.items():
+        print(f"[ERROR] Solution #{i} has wrong sum: {solutions[i]} (sum={s}, target={target})")
+    for i in report.duplicates:
+        print(f"[ERROR] Solution #{i} is a duplicate: {solutions[i]}")
+    for bits in report.missing:
+        print(f"[MISSING] Official solution not found: {bits}")
+    for bits in report.extra:
+        print(f"[EXTRA] Found solution not in the official list: {bits}")
+    print(report.summary())
+    return report.ok
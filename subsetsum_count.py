@@ -0,0 +1,95 @@
+"""
+Counting and uniform sampling of subset-sum solutions
+Solutions are counted over index subsets (the same ones subsets() lists)
+by a DP over sums, without enumerating them.
+"""
+import random
+import sys
+from typing import Dict, List, Optional
+
+from solver_stats import SolverStats, active_stats
+
+
+class SubsetSumCounter:
+    """
+    Forward DP over (item, partial sum) restricted to the "useful" states:
+    partial sums from which the remaining items can still reach the target.
+    rows[i][s] = number of subsets of nums[:i] summing to s, for useful s.
+    Assumes non-negative weights and target.
+    """
+
+    def __init__(self, nums: List[int], target: int, modulus: Optional[int] = None,
+                 stats: Optional[SolverStats] = None):
+        if target < 0 or any(num < 0 for num in nums):
+            raise ValueError("counting assumes non-negative weights and target")
+        self.nums = nums
+        self.target = target
+        self.modulus = modulus
+        n = len(nums)
+
+        # suffix[i]: sums reachable with nums[i:], as a bitset
+        suffix = [0] * (n + 1)
+        suffix[n] = 1
+        mask = (1 << (target + 1)) - 1
+        for i in range(n - 1, -1, -1):
+            suffix[i] = suffix[i + 1] | ((suffix[i + 1] << nums[i]) & mask)
+
+        row: Dict[int, int] = {0: 1} if suffix[0] >> target & 1 else {}
+        self.rows = [row]
+        stats = active_stats(stats)
+        for i, num in enumerate(nums):
+            if stats is not None:
+                stats.dp_cells += len(row)
+                stats.tick()
+            useful = suffix[i + 1]
+            nxt: Dict[int, int] = {}
+            for s, c in row.items():
+                for s2 in (s, s + num):
+                    if s2 <= target and useful >> (target - s2) & 1:
+                        nxt[s2] = nxt.get(s2, 0) + c
+            if modulus is not None:
+                nxt = {s: c % modulus for s, c in nxt.items()}
+            self.rows.append(nxt)
+            row = nxt
+        if stats is not None:
+            # every row is kept for sampling, the suffix bitsets die here
+            stats.table(sum(map(sys.getsizeof, self.rows)) + sum(map(sys.getsizeof, suffix)))
+
+    def count(self) -> int:
+        """Number of solutions (modulo `modulus` if one was given)."""
+        return self.rows[-1].get(self.target, 0)
+
+    def sample(self, k: int, rng: Optional[random.Random] = None) -> List[int]:
+        """
+        k solutions drawn uniformly at random (with replacement), as index
+        bitmasks. Walks the table backwards, taking item i with probability
+        (#solutions using it) / (#solutions).
+        """
+        if self.modulus is not None:
+            raise ValueError("sampling needs exact counts (no modulus)")
+        if not self.count():
+            return []
+        rng = rng or random.Random()
+        samples = []
+        for _ in range(k):
+            s, mask = self.target, 0
+            for i in range(len(self.nums) - 1, -1, -1):
+                total = self.rows[i + 1][s]
+                taken = self.rows[i].get(s - self.nums[i], 0)
+                if rng.randrange(total) < taken:
+                    mask |= 1 << i
+                    s -= self.nums[i]
+            samples.append(mask)
+        return samples
+
+
+def count_solutions(nums: List[int], target: int, modulus: Optional[int] = None,
+                    stats: Optional[SolverStats] = None) -> int:
+    """Exact number of index subsets of nums summing to target."""
+    return SubsetSumCounter(nums, target, modulus, stats).count()
+
+
+def sample_solutions(nums: List[int], target: int, k: int,
+                     seed: Optional[int] = None) -> List[int]:
+    """k uniformly random solutions as index bitmasks ([] if none)."""
+    return SubsetSumCounter(nums, target).sample(k, random.Random(seed))
@@ -0,0 +1,253 @@
+"""
+Digit-decomposed subset-sum solver
+Numbers built by sat_to_subsetsum_base2 are sums of base-4 digit columns.
+When the chosen subset adds up every column exactly to the target digit (no
+carry), the values match; this solver searches for such a subset column by
+column with per-column feasibility propagation, and falls back to a generic
+solver for inputs without that structure. Past the sizes the generic
+solvers take, solutions with carries are searched column by column too,
+each column's digit sum bounded by the carries that can enter and leave it.
+"""
+from typing import List, Optional
+
+from subsetsum import _bitset_witness
+from subsetsum_mitm import mitm_find_one
+
+CANDIDATE_BASES = (4, 2, 8, 16, 10)
+MITM_MAX_ITEMS = 44              # generic fallback: meet in the middle up to here
+DP_MAX_TARGET = 1 << 26          # then bitset DP up to this target
+
+
+class DigitLayout:
+    """
+    Column view of an instance in a given base. Column 0 is the least
+    significant digit.
+        items[i]:   [(column, digit)] non-zero digits of number i
+        columns[c]: [(item, digit)] numbers with a non-zero digit in column c
+        target[c]:  target digit of column c
+        carry_in[c]: largest carry any subset can send into column c
+                    (carry_in[width] is the one out of the top column)
+        carry_free: True if no carry can reach any column, so column-exact
+                    solutions are the only solutions.
+    """
+
+    def __init__(self, items, target_digits, base):
+        self.base = base
+        self.items = items
+        width = max([len(target_digits)] + [c + 1 for digits in items for c, _ in digits])
+        self.target = list(target_digits) + [0] * (width - len(target_digits))
+        self.columns = [[] for _ in range(width)]
+        for i, digits in enumerate(items):
+            for c, d in digits:
+                self.columns[c].append((i, d))
+        self.carry_in = [0]
+        for column in self.columns:
+            self.carry_in.append((sum(d for _, d in column) + self.carry_in[-1]) // base)
+        self.carry_free = not any(self.carry_in)
+
+    def carry_out(self, c):
+        """Largest carry column c can pass on in a solution (none above the top)."""
+        return self.carry_in[c + 1] if c + 1 < len(self.columns) else 0
+
+    def nonzero_digits(self):
+        return sum(len(digits) for digits in self.items) + sum(1 for d in self.target if d)
+
+
+def _int_digits(value: int, base: int):
+    """Non-zero (column, digit) pairs of a non-negative int, column 0 = LSB."""
+    if base & (base - 1) == 0:
+        step = base.bit_length() - 1
+        bits = format(value, "b")[::-1]
+        return [(k // step, int(bits[k:k + step][::-1], 2))
+                for k in range(0, len(bits), step) if "1" in bits[k:k + step]]
+    digits = []
+    column = 0
+    while value:
+        value, d = divmod(value, base)
+        if d:
+            digits.append((column, d))
+        column += 1
+    return digits
+
+
+def _sparse_digits(number):
+    """(column, digit) pairs of a SparseNumber, re-indexed from the LSB."""
+    return [(number.width - 1 - c, d) for c, d in number.columns]
+
+
+def digit_layout(nums, target, base: Optional[int] = None) -> Optional[DigitLayout]:
+    """
+    Column layout of the instance, or None for negative inputs.
+    SparseNumber inputs (sat_subsetsum) are used as they are; for ints the
+    base is `base`, or the first carry-free candidate base, or the one with
+    the fewest non-zero digits.
+    """
+    if all(hasattr(num, "columns") for num in nums) and hasattr(target, "columns"):
+        return DigitLayout([_sparse_digits(num) for num in nums],
+                           _target_list(_sparse_digits(target)), target.base)
+    values = [int(num) for num in nums]
+    target = int(target)
+    if target < 0 or any(v < 0 for v in values):
+        return None
+    best = None
+    for b in ((base,) if base else CANDIDATE_BASES):
+        if b == 10 and max(values + [target]).bit_length() > 10000:
+            continue
+        layout = DigitLayout([_int_digits(v, b) for v in values],
+                             _target_list(_int_digits(target, b)), b)
+        if layout.carry_free:
+            return layout
+        if best is None or layout.nonzero_digits() < best.nonzero_digits():
+            best = layout
+    return best
+
+
+def _target_list(digits):
+    out = [0] * (max((c for c, _ in digits), default=-1) + 1)
+    for c, d in digits:
+        out[c] = d
+    return out
+
+
+def _solve_columns(layout: DigitLayout, exact: bool = True) -> Optional[int]:
+    """
+    Find a subset whose digits add up exactly to the target digit in every
+    column. DFS over items with propagation: in each column the undecided
+    digits left (rem) must be able to close the gap (need = target - cur).
+    With exact=False the subset may carry: the digit sum of column c only
+    has to lie in [target - carry_in[c], target + base * carry_out(c)]
+    (exact again where no carry can come in or go out), columns are decided
+    from the least significant one up, and the decided ones must spell the
+    target digits with their actual carries. A None is then a proof that no
+    subset sums to the target.
+    Returns an index bitmask or None.
+    """
+    items, columns, target = layout.items, layout.columns, layout.target
+    if exact:
+        low, high = target, target
+    else:
+        low = [t - layout.carry_in[c] for c, t in enumerate(target)]
+        high = [t + layout.base * layout.carry_out(c) for c, t in enumerate(target)]
+    cur = [0] * len(columns)
+    rem = [sum(d for _, d in column) for column in columns]
+    decision = [None] * len(items)
+    trail = []
+
+    def assign(i, value, queue):
+        decision[i] = value
+        trail.append(i)
+        for c, d in items[i]:
+            rem[c] -= d
+            if value:
+                cur[c] += d
+            queue.append(c)
+
+    def undo(mark):
+        while len(trail) > mark:
+            i = trail.pop()
+            for c, d in items[i]:
+                rem[c] += d
+                if decision[i]:
+                    cur[c] -= d
+            decision[i] = None
+
+    def propagate(queue):
+        while queue:
+            c = queue.pop()
+            need, most, left = low[c] - cur[c], high[c] - cur[c], rem[c]
+            if most < 0 or need > left:
+                return False
+            if left == 0:
+                continue
+            for i, d in columns[c]:
+                if decision[i] is not None:
+                    continue
+                if d > most:
+                    assign(i, 0, queue)
+                elif left - d < need:
+                    assign(i, 1, queue)
+        return True
+
+    def settled():
+        # the closed low columns, with their carries, spell the target digits
+        carry = 0
+        for c, total in enumerate(cur):
+            if rem[c]:
+                return True
+            carry, digit = divmod(total + carry, layout.base)
+            if digit != target[c]:
+                return False
+        return carry == 0
+
+    def consistent(queue):
+        return propagate(queue) and (exact or settled())
+
+    def pick():
+        # exact: undecided item of the open column with the fewest undecided
+        # items; with carries: of the lowest open column
+        best, best_size = None, None
+        for c, column in enumerate(columns):
+            if rem[c] == 0:
+                continue
+            free = [i for i, _ in column if decision[i] is None]
+            if not exact:
+                return free[0]
+            if best_size is None or len(free) < best_size:
+                best, best_size = free[0], len(free)
+                if best_size == 1:
+                    break
+        return best
+
+    if not consistent(list(range(len(columns)))):
+        return None
+    stack = []   # (trail mark, item, value still to try or None)
+    while True:
+        item = pick()
+        if item is None:
+            return sum(1 << i for i, value in enumerate(decision) if value)
+        stack.append((len(trail), item, 0))
+        queue = []
+        assign(item, 1, queue)
+        ok = consistent(queue)
+        while not ok:
+            while stack and stack[-1][2] is None:
+                undo(stack.pop()[0])
+            if not stack:
+                return None
+            mark, item, value = stack.pop()
+            undo(mark)
+            stack.append((mark, item, None))
+            queue = []
+            assign(item, value, queue)
+            ok = consistent(queue)
+
+
+def _generic_find_one(values: List[int], target: int,
+                      layout: Optional[DigitLayout] = None) -> Optional[int]:
+    if len(values) <= MITM_MAX_ITEMS or target < 0 or any(v < 0 for v in values):
+        return mitm_find_one(values, target)
+    if target <= DP_MAX_TARGET:
+        indices = _bitset_witness(values, list(range(len(values))), target)
+        return None if indices is None else sum(1 << i for i in indices)
+    # too large for both: search the columns again, letting them carry
+    return _solve_columns(layout or digit_layout(values, target), exact=False)
+
+
+def solve_digits(nums, target, base: Optional[int] = None,
+                 fallback: bool = True) -> Optional[int]:
+    """
+    One solution as an index bitmask, or None.
+    Tries a carry-free column-by-column solution first. If none exists and
+    the layout cannot carry, there is no solution at all; otherwise (or for
+    inputs without usable digit structure) falls back to meet in the middle
+    or the bitset DP when they fit, and else to a column search bounded by
+    the carries each column can take, whose None is also a proof.
+    """
+    layout = digit_layout(nums, target, base)
+    if layout is not None:
+        mask = _solve_columns(layout)
+        if mask is not None or layout.carry_free:
+            return mask
+    if not fallback:
+        return None
+    return _generic_find_one([int(num) for num in nums], int(target), layout)
@@ -0,0 +1,258 @@
+"""
+Reusable subset-sum index over one weight multiset
+Built once for all targets up to max_target, then answers reachable(t) and
+count(t) in O(1) and one_witness(t) in O(n). Weights can be added later, and
+the index can be saved to a file that other processes open with mmap.
+"""
+import json
+import mmap
+import os
+import sys
+from array import array
+from typing import List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # counts are then updated by a loop over reachable sums
+    np = None
+
+_MAGIC = b"SSX1\n"
+_ALIGN = 8
+EXACT_UINT64_ITEMS = 63   # up to this many weights every count is < 2**63
+
+
+def _set_bits(x):
+    """Indices of the set bits of a non-negative int, increasing."""
+    bits = format(x, "b")[::-1]
+    i = bits.find("1")
+    while i >= 0:
+        yield i
+        i = bits.find("1", i + 1)
+
+
+class _WideCounts:
+    """Read-only view of fixed-width little-endian unsigned counts."""
+
+    def __init__(self, buffer, width):
+        self.buffer = buffer
+        self.width = width
+
+    def __len__(self):
+        return len(self.buffer) // self.width
+
+    def __getitem__(self, t):
+        w = self.width
+        return int.from_bytes(self.buffer[t * w:(t + 1) * w], "little")
+
+
+def _add_shifted_limbs(limbs, num):
+    """limbs[:, s] += limbs[:, s - num] for every s >= num, with carries."""
+    size = limbs.shape[1]
+    source = limbs[:, :size - num].copy()
+    carry = np.zeros(size - num, dtype=np.uint64)
+    for k in range(len(limbs)):
+        row = limbs[k, num:]
+        total = row + source[k]
+        overflow = total < row
+        with_carry = total + carry
+        overflow |= with_carry < total
+        row[:] = with_carry
+        carry = overflow.astype(np.uint64)
+
+
+class SubsetSumIndex:
+    """
+    For every sum s in 0..max_target:
+        bits     reachable sums as one big-int bitset (bit s)
+        parent   array('i'): 1 + index of the weight that first reached s,
+                 0 if s is unreachable (and for s = 0). Following parents
+                 gives a witness whose indices strictly decrease.
+        counts   number of index subsets summing to s: array('Q') while
+                 there are at most EXACT_UINT64_ITEMS weights; beyond that
+                 a (limbs, max_target + 1) uint64 NumPy array of 64-bit
+                 limbs (low limb first), or Python ints without NumPy.
+    Assumes non-negative weights, like SubsetSumCounter.
+    """
+
+    def __init__(self, nums: List[int] = (), max_target: int = 0):
+        if max_target < 0:
+            raise ValueError("max_target must be non-negative")
+        self.max_target = max_target
+        self.nums: List[int] = []
+        self.bits = 1
+        self.parent = array("i", [0]) * (max_target + 1)
+        self.counts = array("Q", [0]) * (max_target + 1)
+        self.counts[0] = 1
+        self._mmap = None
+        for num in nums:
+            self.add_weight(num)
+
+    # ---- queries ----
+
+    def _check(self, t):
+        if t > self.max_target:
+            raise ValueError(f"target {t} above max_target {self.max_target}")
+
+    def reachable(self, t: int) -> bool:
+        if t < 0:
+            return False
+        self._check(t)
+        return t == 0 or self.parent[t] != 0
+
+    def one_witness(self, t: int) -> Optional[int]:
+        """One subset summing to t as an index bitmask, or None."""
+        if not self.reachable(t):
+            return None
+        mask = 0
+        while t:
+            i = self.parent[t] - 1
+            mask |= 1 << i
+            t -= self.nums[i]
+        return mask
+
+    def count(self, t: int) -> int:
+        """Number of index subsets summing to t."""
+        if t < 0:
+            return 0
+        self._check(t)
+        if np is not None and isinstance(self.counts, np.ndarray):
+            return sum(int(limb) << (64 * k) for k, limb in enumerate(self.counts[:, t]))
+        return int(self.counts[t])
+
+    # ---- updates ----
+
+    def add_weight(self, num: int):
+        """Add one weight, updating every table in O(max_target)."""
+        if num < 0:
+            raise ValueError("the index assumes non-negative weights")
+        self._materialize()
+        index = len(self.nums)
+        self.nums.append(num)
+        limit = self.max_target
+        self._grow_counts()
+        if num > limit:
+            return
+
+        old = self.bits
+        # counts first: they read the reachable sums before this weight
+        if np is not None and isinstance(self.counts, array):
+            view = np.frombuffer(self.counts, dtype=np.uint64)
+            view[num:] += view[:len(view) - num].copy()
+        elif np is not None and isinstance(self.counts, np.ndarray):
+            _add_shifted_limbs(self.counts, num)
+        else:
+            counts = self.counts
+            for s in reversed(list(_set_bits(old & ((1 << (limit - num + 1)) - 1)))):
+                counts[s + num] += counts[s]
+
+        self.bits = old | ((old << num) & ((1 << (limit + 1)) - 1))
+        parent = self.parent
+        for s in _set_bits(self.bits & ~old):
+            parent[s] = index + 1
+
+    def _grow_counts(self):
+        """
+        Switch counts to a representation that cannot overflow with the
+        current n weights: counts are at most 2**n, so n // 64 + 1 limbs.
+        """
+        n, counts = len(self.nums), self.counts
+        if n <= EXACT_UINT64_ITEMS:
+            return
+        if isinstance(counts, array):
+            if np is None:
+                self.counts = list(counts)
+                return
+            counts = np.frombuffer(counts, dtype=np.uint64).reshape(1, -1).copy()
+        if np is not None and isinstance(counts, np.ndarray):
+            limbs = n // 64 + 1
+            if len(counts) < limbs:
+                counts = np.vstack([counts, np.zeros((limbs - len(counts), counts.shape[1]),
+                                                     dtype=np.uint64)])
+            self.counts = counts
+
+    # ---- persistence ----
+
+    def _materialize(self):
+        """Copy mmapped tables into private arrays before modifying them."""
+        if self._mmap is None:
+            return
+        self.parent = array("i", self.parent)
+        if isinstance(self.counts, _WideCounts):
+            wide = self.counts
+            if np is None:
+                self.counts = [wide[t] for t in range(len(wide))]
+            else:
+                limbs = np.frombuffer(wide.buffer, dtype="<u8").reshape(-1, wide.width // 8)
+                self.counts = limbs.T.astype(np.uint64)
+        else:
+            self.counts = array("Q", self.counts)
+        self._mmap = None
+
+    def save(self, path: str):
+        """
+        Write the index: magic, one JSON header line padded to 8 bytes, then
+        the parent array, the counts (uint64, or `count_width` bytes each,
+        i.e. little-endian 64-bit limbs, when they grew past 64 bits) and the
+        reachable bitset.
+        """
+        if isinstance(self.counts, (array, memoryview)):
+            counts = bytes(self.counts)
+            width = 8
+        elif np is not None and isinstance(self.counts, np.ndarray):
+            width = 8 * len(self.counts)
+            counts = np.ascontiguousarray(self.counts.T).astype("<u8").tobytes()
+        else:
+            largest = max(int(self.counts[t]) for t in range(self.max_target + 1))
+            width = 8 * max(1, (largest.bit_length() + 63) // 64)
+            counts = b"".join(int(self.counts[t]).to_bytes(width, "little")
+                              for t in range(self.max_target + 1))
+        header = json.dumps({"max_target": self.max_target,
+                             "nums": [str(num) for num in self.nums],
+                             "count_width": width,
+                             "byteorder": sys.byteorder}).encode()
+        head = _MAGIC + header + b"\n"
+        head += b" " * (-len(head) % _ALIGN)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(head)
+            f.write(bytes(self.parent))
+            f.write(b"\0" * (-f.tell() % _ALIGN))
+            f.write(counts)
+            f.write(self.bits.to_bytes((self.max_target + 8) // 8, "little"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "SubsetSumIndex":
+        """
+        Open a saved index with a read-only mmap: the tables are not copied,
+        so processes loading the same file share its pages.
+        """
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mm[:len(_MAGIC)] != _MAGIC:
+            raise ValueError("not a subset-sum index file")
+        end = mm.find(b"\n", len(_MAGIC))
+        header = json.loads(mm[len(_MAGIC):end])
+        size = header["max_target"] + 1
+        width = header["count_width"]
+        start = end + 1 + (-(end + 1) % _ALIGN)
+        counts_start = start + 4 * size + (-(4 * size) % _ALIGN)
+        bits_start = counts_start + width * size
+        buffer = memoryview(mm)
+
+        index = cls.__new__(cls)
+        index.max_target = header["max_target"]
+        index.nums = [int(num) for num in header["nums"]]
+        index.bits = int.from_bytes(buffer[bits_start:], "little")
+        index.parent = buffer[start:start + 4 * size].cast("i")
+        if width == 8:
+            index.counts = buffer[counts_start:bits_start].cast("Q")
+        else:
+            index.counts = _WideCounts(buffer[counts_start:bits_start], width)
+        index._mmap = mm
+        if header["byteorder"] != sys.byteorder:
+            index._materialize()
+            index.parent.byteswap()
+            if isinstance(index.counts, array):
+                index.counts.byteswap()
+        return index
@@ -0,0 +1,142 @@
+"""
+Meet-in-the-middle subset-sum solvers
+Horowitz-Sahni (two sorted halves, O(2^(n/2)) memory) and Schroeppel-Shamir
+(four sorted quarters streamed through heaps, O(2^(n/4)) memory).
+Solutions are index bitmasks: bit i set <-> nums[i] is in the subset.
+Weights may be negative.
+"""
+import heapq
+import sys
+from typing import Iterator, List, Optional, Tuple
+
+from solver_stats import SolverStats, active_stats
+
+SumList = List[Tuple[int, int]]   # sorted (sum, mask) pairs
+
+
+def _sorted_sums(nums: List[int], indices, stats: Optional[SolverStats] = None) -> SumList:
+    """All (subset sum, mask) pairs over `indices`, sorted by sum.
+    Each item merges the current list with a shifted copy of itself."""
+    sums = [(0, 0)]
+    for i in indices:
+        w, bit = nums[i], 1 << i
+        shifted = [(s + w, m | bit) for s, m in sums]
+        # two sorted runs: timsort merges them in linear time
+        sums += shifted
+        sums.sort()
+        if stats is not None:
+            stats.dp_cells += len(shifted)
+            stats.tick()
+    return sums
+
+
+def _table_bytes(*lists: SumList) -> int:
+    """Rough size of sum lists: list slots plus one (sum, mask) tuple each."""
+    return sum(sys.getsizeof(sums) + len(sums) * sys.getsizeof((0, 0)) for sums in lists)
+
+
+def _equal_runs(ascending: Iterator[Tuple[int, int]],
+                descending: Iterator[Tuple[int, int]],
+                target: int):
+    """
+    Two-pointer walk over an ascending and a descending stream of
+    (sum, mask). Yields (masks_a, masks_b) for every pair of equal-sum runs
+    with sum_a + sum_b == target.
+    """
+    a = next(ascending, None)
+    b = next(descending, None)
+    while a is not None and b is not None:
+        total = a[0] + b[0]
+        if total < target:
+            a = next(ascending, None)
+        elif total > target:
+            b = next(descending, None)
+        else:
+            run_a, run_b = [a[1]], [b[1]]
+            a = next(ascending, None)
+            while a is not None and a[0] == target - b[0]:
+                run_a.append(a[1])
+                a = next(ascending, None)
+            b_sum = b[0]
+            b = next(descending, None)
+            while b is not None and b[0] == b_sum:
+                run_b.append(b[1])
+                b = next(descending, None)
+            yield run_a, run_b
+
+
+def _horowitz_sahni_runs(nums: List[int], target: int, stats=None):
+    n = len(nums)
+    left = _sorted_sums(nums, range(n // 2), stats)
+    right = _sorted_sums(nums, range(n // 2, n), stats)
+    if stats is not None:
+        stats.table(_table_bytes(left, right))
+    return _equal_runs(iter(left), reversed(right), target)
+
+
+def _pair_sums(first: SumList, second: SumList, descending=False):
+    """
+    Stream first[i] + second[j] in sorted order using a heap holding one
+    cursor per element of `first` (O(len(first)) memory).
+    """
+    if not first or not second:
+        return
+    sign = -1 if descending else 1
+    start = len(second) - 1 if descending else 0
+    step = -1 if descending else 1
+    heap = [(sign * (s + second[start][0]), i, start) for i, (s, _) in enumerate(first)]
+    heapq.heapify(heap)
+    while heap:
+        key, i, j = heap[0]
+        yield sign * key, first[i][1] | second[j][1]
+        j += step
+        if 0 <= j < len(second):
+            heapq.heapreplace(heap, (sign * (first[i][0] + second[j][0]), i, j))
+        else:
+            heapq.heappop(heap)
+
+
+def _schroeppel_shamir_runs(nums: List[int], target: int, stats=None):
+    n = len(nums)
+    cuts = [0, n // 4, n // 2, (3 * n) // 4, n]
+    q1, q2, q3, q4 = (_sorted_sums(nums, range(cuts[k], cuts[k + 1]), stats)
+                      for k in range(4))
+    if stats is not None:
+        # the two heaps hold one (key, i, j) entry per element of q1 / q3
+        stats.table(_table_bytes(q1, q2, q3, q4)
+                    + (len(q1) + len(q3)) * sys.getsizeof((0, 0, 0)))
+    return _equal_runs(_pair_sums(q1, q2), _pair_sums(q3, q4, descending=True), target)
+
+
+def _runs(nums: List[int], target: int, low_memory: bool, stats=None):
+    stats = active_stats(stats)
+    if low_memory:
+        return _schroeppel_shamir_runs(nums, target, stats)
+    return _horowitz_sahni_runs(nums, target, stats)
+
+
+def mitm_find_one(nums: List[int], target: int, low_memory: bool = False,
+                  stats: Optional[SolverStats] = None) -> Optional[int]:
+    """
+    One solution as an index bitmask, or None.
+    low_memory=True uses Schroeppel-Shamir (O(2^(n/4)) memory).
+    """
+    for run_a, run_b in _runs(nums, target, low_memory, stats):
+        return run_a[0] | run_b[0]
+    return None
+
+
+def mitm_count(nums: List[int], target: int, low_memory: bool = False,
+               stats: Optional[SolverStats] = None) -> int:
+    """Number of index subsets summing to target (without listing them)."""
+    return sum(len(run_a) * len(run_b)
+               for run_a, run_b in _runs(nums, target, low_memory, stats))
+
+
+def iter_mitm_solutions(nums: List[int], target: int, low_memory: bool = False,
+                        stats: Optional[SolverStats] = None) -> Iterator[int]:
+    """Yield every solution as an index bitmask."""
+    for run_a, run_b in _runs(nums, target, low_memory, stats):
+        for mask_a in run_a:
+            for mask_b in run_b:
+                yield mask_a | mask_b
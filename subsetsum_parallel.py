@@ -0,0 +1,91 @@
+"""
+Multiprocess subset-sum search
+The backtracking tree of iter_subsets is split by fixing its first decisions
+(how many copies of the first weight groups are taken); the resulting
+subtrees run on a ProcessPoolExecutor.
+"""
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterator, List, Optional
+
+from subsetsum import _GroupSearch
+
+TASKS_PER_WORKER = 8   # subtrees per worker, for load balancing
+
+_cancel_event = None   # set in each worker by _init_worker
+
+
+def _init_worker(event):
+    global _cancel_event
+    _cancel_event = event
+
+
+def _run_subtrees(nums, target, states, distinct, find_one):
+    """Worker: explore the subtrees below `states`, returns a list of masks."""
+    search = _GroupSearch(nums, target)
+    solutions = search.run(states, distinct, should_stop=_cancel_event.is_set)
+    if find_one:
+        first = next(solutions, None)
+        return [] if first is None else [first]
+    return list(solutions)
+
+
+def _split(search: _GroupSearch, tasks: int, split_depth: Optional[int]):
+    """
+    Expand the tree breadth-first, one decision level at a time, until there
+    are at least `tasks` subtrees (or `split_depth` levels are fixed).
+    """
+    frontier = search.roots()
+    depth = 0
+    while frontier and len(frontier) < tasks and not search.is_leaf(frontier[0]):
+        if split_depth is not None and depth >= split_depth:
+            break
+        frontier = [child for state in frontier for child in search.children(state)]
+        depth += 1
+    return frontier
+
+
+def _submit_all(executor, nums, target, frontier, distinct, find_one):
+    return [executor.submit(_run_subtrees, nums, target, [state], distinct, find_one)
+            for state in frontier]
+
+
+def parallel_iter_subsets(nums: List[int], target: int, workers: Optional[int] = None,
+                          distinct: bool = False, split_depth: Optional[int] = None,
+                          find_one: bool = False) -> Iterator[int]:
+    """
+    Same solutions as iter_subsets (index bitmasks), computed on `workers`
+    processes. Results of each subtree are yielded as soon as it completes,
+    so their order is not deterministic. With find_one=True, stops after the
+    first solution and cancels every other worker.
+    """
+    workers = workers or os.cpu_count() or 1
+    search = _GroupSearch(nums, target)
+    frontier = _split(search, workers * TASKS_PER_WORKER, split_depth)
+    if not frontier:
+        return
+    event = multiprocessing.get_context().Event()
+    executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(event,))
+    try:
+        pending = set(_submit_all(executor, nums, target, frontier, distinct, find_one))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for mask in future.result():
+                    yield mask
+                    if find_one:
+                        return
+    finally:
+        # early exit (find_one, or the caller stopped iterating): stop workers
+        event.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def parallel_find_one(nums: List[int], target: int, workers: Optional[int] = None,
+                      split_depth: Optional[int] = None) -> Optional[int]:
+    """One solution as an index bitmask, or None."""
+    for mask in parallel_iter_subsets(nums, target, workers, distinct=True,
+                                      split_depth=split_depth, find_one=True):
+        return mask
+    return None
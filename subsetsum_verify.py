@@ -0,0 +1,146 @@
+"""
+Batch verification of subset-sum solution sets
+Found solutions (index bitmasks) are packed into a 0/1 matrix, all their sums
+are checked at once, and they are compared with the official solutions of the
+instance through a hashed index of 0/1 strings.
+"""
+from itertools import compress
+from typing import Dict, List
+
+from subsetsum import mask_to_bitstring, mask_to_selection
+
+try:
+    import numpy as np
+except ImportError:  # pure Python fallback below
+    np = None
+
+CHUNK_ROWS = 1 << 14          # solutions packed per matrix
+_INT64_SAFE = 1 << 62         # |partial sums| must stay below this
+
+
+class VerificationReport:
+    """
+    Result of verify_solutions:
+        checked:    number of solutions given
+        invalid:    {index in the input: actual sum} for sums != target
+        duplicates: indices of solutions already seen earlier in the input
+        missing:    official 0/1 strings that were not found
+        extra:      valid found 0/1 strings that are not official
+        official:   number of official solutions
+    """
+
+    def __init__(self, checked, invalid, duplicates, missing, extra, official):
+        self.checked = checked
+        self.invalid = invalid
+        self.duplicates = duplicates
+        self.missing = missing
+        self.extra = extra
+        self.official = official
+
+    @property
+    def ok(self):
+        return not (self.invalid or self.duplicates or self.missing or self.extra)
+
+    def summary(self):
+        return (f"{self.checked} checked, {len(self.invalid)} invalid, "
+                f"{len(self.duplicates)} duplicate, {len(self.missing)} missing, "
+                f"{len(self.extra)} extra (official: {self.official})")
+
+
+def known_solution_keys(rows: List[str], n: int) -> frozenset:
+    """
+    Official solutions as a set of 0/1 strings (character i = weight i).
+    The FSU _s files are vertical: one row per weight, one column per
+    solution ("1  0  1"). Rows that are already full 0/1 vectors of length n
+    are accepted too. A file with the wrong number of rows gives keys of the
+    wrong length, which then show up as missing.
+    """
+    table = [row.split() for row in rows if row.strip()]
+    if not table:
+        return frozenset()
+    if len(table) != n and all(len("".join(row)) == n for row in table):
+        return frozenset("".join(row) for row in table)
+    return frozenset("".join(column) for column in zip(*table))
+
+
+def _limbs(value, width, count):
+    """Signed base-2**width digits of value, low first; the top one keeps the sign."""
+    mask = (1 << width) - 1
+    digits = [(value >> (width * k)) & mask for k in range(count - 1)]
+    digits.append(value >> (width * (count - 1)))
+    return digits
+
+
+def _pack(masks, n):
+    """uint8 0/1 matrix, one row per mask."""
+    flat = "".join(mask_to_bitstring(mask, n) for mask in masks).encode()
+    return (np.frombuffer(flat, dtype=np.uint8) - ord("0")).reshape(len(masks), n)
+
+
+def _wrong_sums_numpy(nums, target, masks):
+    """Row indices whose sum differs from target, one matrix product per limb."""
+    n = len(nums)
+    matrix = _pack(masks, n)
+    bound = sum(abs(num) for num in nums) + abs(target)
+    if bound < _INT64_SAFE:
+        sums = matrix.astype(np.int64) @ np.array(nums, dtype=np.int64)
+        return np.flatnonzero(sums != target).tolist()
+    # big weights: split every weight into signed limbs small enough that a
+    # row sum of one limb fits in int64, then compare with the target limb by
+    # limb, carrying upwards
+    width = 62 - max(n, 1).bit_length() - 1
+    top = max(abs(num) for num in nums + [target]).bit_length()
+    count = top // width + 1
+    limbs = np.array([_limbs(num, width, count) for num in nums], dtype=np.int64)
+    goal = _limbs(target, width, count)
+    carry = np.zeros(len(masks), dtype=np.int64)
+    wrong = np.zeros(len(masks), dtype=bool)
+    low = (1 << width) - 1
+    matrix = matrix.astype(np.int64)
+    for k in range(count):
+        column = matrix @ limbs[:, k] + carry - goal[k]
+        if k < count - 1:
+            wrong |= (column & low) != 0
+            carry = column >> width
+        else:
+            wrong |= column != 0
+    return np.flatnonzero(wrong).tolist()
+
+
+def _wrong_sums_python(nums, target, masks):
+    n = len(nums)
+    return [i for i, mask in enumerate(masks)
+            if sum(compress(nums, mask_to_selection(mask, n))) != target]
+
+
+def verify_solutions(nums: List[int], target: int, masks,
+                     known_rows: List[str]) -> VerificationReport:
+    """
+    Check found solutions (index bitmasks, e.g. from iter_subsets) against
+    the target and the official rows returned by load_instance.
+    """
+    masks = list(masks)
+    n = len(nums)
+    official = known_solution_keys(known_rows, n)
+    wrong_sums = _wrong_sums_numpy if np is not None and n else _wrong_sums_python
+    invalid: Dict[int, int] = {}
+    for start in range(0, len(masks), CHUNK_ROWS):
+        chunk = masks[start:start + CHUNK_ROWS]
+        for i in wrong_sums(nums, target, chunk):
+            selection = mask_to_selection(chunk[i], n)
+            invalid[start + i] = sum(compress(nums, selection))
+
+    found = set()
+    duplicates = []
+    extra = []
+    for i, mask in enumerate(masks):
+        key = mask_to_bitstring(mask, n)
+        if key in found:
+            duplicates.append(i)
+            continue
+        found.add(key)
+        if i not in invalid and key not in official:
+            extra.append(key)
+    missing = sorted(official - found)
+    return VerificationReport(len(masks), invalid, duplicates, missing, extra,
+                              len(official))
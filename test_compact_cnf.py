@@ -0,0 +1,29 @@
+"""
+CompactFormula.verify_batch checked against one verify() per assignment
+"""
+import random
+
+import pytest
+
+import compact_cnf
+from compact_cnf import CompactFormula
+
+NUM_VARS = 12
+
+
+@pytest.mark.parametrize("chunk_bytes", [1, 100, compact_cnf.VERIFY_CHUNK_BYTES])
+@pytest.mark.parametrize("numpy", [True, False])
+def test_verify_batch_matches_verify(monkeypatch, numpy, chunk_bytes):
+    if not numpy:
+        monkeypatch.setattr(compact_cnf, "np", None)
+    monkeypatch.setattr(compact_cnf, "VERIFY_CHUNK_BYTES", chunk_bytes)
+    rng = random.Random(chunk_bytes)
+    formula = CompactFormula.from_clauses(
+        [[v if rng.random() < 0.5 else -v for v in rng.sample(range(1, NUM_VARS + 1), 3)]
+         for _ in range(20)], NUM_VARS)
+    # partial assignments too: unassigned variables make no literal true
+    assignments = [{v: rng.random() < 0.5 for v in range(1, NUM_VARS + 1)
+                    if rng.random() < 0.9} for _ in range(50)]
+    expected = [formula.verify(assignment) for assignment in assignments]
+    assert any(expected) and not all(expected)
+    assert formula.verify_batch(assignments) == expected
@@ -0,0 +1,48 @@
+"""
+Dashboard jobs: results come back per job and cancel stops the solvers
+"""
+import random
+
+from dashboard_jobs import ALGORITHMS, JobManager, wait_for
+from subsetsum import mask_to_subset
+from subsetsum_count import count_solutions
+
+NUMS, TARGET = [3, 5, 7, 11, 2], 10
+
+
+def test_jobs_report_results():
+    manager = JobManager(workers=2)
+    try:
+        jobs = {algorithm: manager.submit("small", algorithm, NUMS, TARGET)
+                for algorithm in ALGORITHMS}
+        for job in jobs.values():
+            wait_for(manager, job, timeout=30)
+        assert all(job.status == "done" for job in jobs.values())
+        expected = count_solutions(NUMS, TARGET)
+        assert jobs["count"].result == jobs["backtracking"].result == expected
+        assert all(sum(mask_to_subset(NUMS, mask)) == TARGET
+                   for job in jobs.values() for mask in job.solutions)
+        for algorithm in ("dp", "mitm"):
+            assert sum(mask_to_subset(NUMS, jobs[algorithm].result)) == TARGET
+    finally:
+        manager.shutdown()
+
+
+def test_cancel_stops_the_solver_without_terminate():
+    rng = random.Random(0)
+    nums = [rng.randint(1, 2000) for _ in range(400)]
+    manager = JobManager(workers=1)
+    try:
+        job = manager.submit("big", "count", nums, sum(nums) // 2)
+        later = manager.submit("small", "dp", NUMS, TARGET)
+        process = manager._running[job.id][0]
+        manager.cancel(job.id)
+        wait_for(manager, job, timeout=30)
+        assert job.status == "cancelled"
+        process.join(timeout=5)
+        assert process.exitcode == 0   # stopped at a progress poll, not killed
+        wait_for(manager, later, timeout=30)
+        assert later.status == "done"
+        assert sum(mask_to_subset(NUMS, later.result)) == TARGET
+    finally:
+        manager.shutdown()
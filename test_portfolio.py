@@ -0,0 +1,53 @@
+"""
+Portfolio front end: answers are verified and the budget is respected
+"""
+import random
+import time
+
+from benchmarks import random_cnf
+from portfolio import solve_sat, solve_subsetsum, subsetsum_costs, subsetsum_features
+from sat import solve_sat_bruteforce, verify_sat
+from sat_subsetsum import sat_to_subsetsum_base2
+from subsetsum import mask_to_subset
+
+BUDGET = 2.0
+SLACK = 1.5   # process start-up and teardown
+
+
+def test_budget_is_respected():
+    # hard random instance whose cheapest-looking engine used to run unbounded
+    rng = random.Random(0)
+    nums = [rng.getrandbits(250) for _ in range(100)]
+    target = sum(nums[::3])
+    start = time.perf_counter()
+    result = solve_subsetsum(nums, target, budget=BUDGET)
+    assert time.perf_counter() - start < BUDGET + SLACK
+    if result.status == "sat":
+        assert sum(mask_to_subset(nums, result.answer)) == target
+    else:
+        assert result.status == "timeout"
+
+
+def test_subsetsum_answers():
+    assert solve_subsetsum([3, 5, 7, 11], 15).status == "sat"
+    assert solve_subsetsum([2, 4, 6], 7).status == "unsat"
+    result = solve_subsetsum([3, 34, 4, 12, 5, 2], 9, engines=["mitm", "backtracking"])
+    assert result.status == "sat" and result.engine in ("mitm", "backtracking")
+    assert sum(mask_to_subset([3, 34, 4, 12, 5, 2], result.answer)) == 9
+
+
+def test_digits_offered_for_reductions():
+    nums, target, _ = sat_to_subsetsum_base2(random_cnf(10, 30), 10)
+    assert "digits" in subsetsum_costs(subsetsum_features(nums, target))
+    result = solve_subsetsum(nums, target, budget=10)
+    assert result.status == "sat"
+    assert sum(mask_to_subset(nums, result.answer)) == target
+
+
+def test_sat_answers():
+    for seed in range(5):
+        formula = random_cnf(10, 45, seed=seed)
+        result = solve_sat(formula, 10, budget=10)
+        assert result.status == ("unsat" if solve_sat_bruteforce(formula, 10) is None else "sat")
+        if result.status == "sat":
+            assert verify_sat(formula, result.answer)
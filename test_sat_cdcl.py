@@ -0,0 +1,70 @@
+"""
+CDCL solver checked against the brute-force solver
+"""
+import random
+
+import pytest
+
+from sat import solve_sat_bruteforce, verify_sat
+from sat_cdcl import CDCLSolver, solve_sat_cdcl
+
+NUM_VARS = 8
+
+
+def _random_cnf(num_vars, num_clauses, seed):
+    """Clauses of 1 to 3 distinct variables with random signs."""
+    rng = random.Random(seed)
+    return [[v if rng.random() < 0.5 else -v
+             for v in rng.sample(range(1, num_vars + 1), rng.randint(1, 3))]
+            for _ in range(num_clauses)]
+
+
+def _formulas(count=60):
+    for seed in range(count):
+        # around the 3-SAT threshold: a mix of SAT and UNSAT formulas
+        yield _random_cnf(NUM_VARS, 30 + seed % 20, seed)
+
+
+@pytest.mark.parametrize("formula", list(_formulas()))
+def test_cdcl_agrees_with_bruteforce(formula):
+    expected = solve_sat_bruteforce(formula, NUM_VARS)
+    model = solve_sat_cdcl(formula, NUM_VARS)
+    assert (model is None) == (expected is None)
+    if model is not None:
+        assert verify_sat(formula, model)
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_assumptions_and_unsat_core(seed):
+    rng = random.Random(seed)
+    formula = _random_cnf(NUM_VARS, 20, seed)
+    solver = CDCLSolver(NUM_VARS)
+    for clause in formula:
+        solver.add_clause(clause)
+    for _ in range(5):
+        assumptions = [v if rng.random() < 0.5 else -v
+                       for v in rng.sample(range(1, NUM_VARS + 1), 4)]
+        expected = solve_sat_bruteforce(formula + [[lit] for lit in assumptions], NUM_VARS)
+        assert solver.solve(assumptions) == (expected is not None)
+        if expected is not None:
+            model = solver.model()
+            assert verify_sat(formula, model)
+            assert all(model[abs(lit)] == (lit > 0) for lit in assumptions)
+        elif solver.ok:
+            core = solver.unsat_core()
+            assert set(core) <= set(assumptions)
+            assert solve_sat_bruteforce(formula + [[lit] for lit in core], NUM_VARS) is None
+    # failing under assumptions must not poison later calls
+    assert solver.solve() == (solve_sat_bruteforce(formula, NUM_VARS) is not None)
+
+
+def test_iter_models_counts_every_model():
+    formula = _random_cnf(6, 10, 3)
+    solver = CDCLSolver(6)
+    for clause in formula:
+        solver.add_clause(clause)
+    models = list(solver.iter_models())
+    expected = sum(verify_sat(formula, {v: bool(bits >> (v - 1) & 1) for v in range(1, 7)})
+                   for bits in range(1 << 6))
+    assert len(models) == expected
+    assert all(verify_sat(formula, model) for model in models)
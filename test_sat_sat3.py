@@ -0,0 +1,70 @@
+"""
+SAT -> 3-SAT reductions: satisfiability is preserved and models project back
+"""
+import random
+
+import pytest
+
+from read_write_files import dimacs_reader, write_dimacs
+from sat import solve_sat_bruteforce, verify_sat
+from sat_cdcl import solve_sat_cdcl
+from sat_sat3 import (project_assignment, sat_3sat, sat_3sat_file, sat_3sat_optimized,
+                      verify_projection_preserves_satisfiability)
+
+NUM_VARS = 6
+# satisfiable, and used to become UNSAT when auxiliaries started at 1
+HEADERLESS_EXAMPLE = [[1, 1, -1, 1], [-1, 1, 1, 1], [1, 1, -1], [-1]]
+# a bare "0" line: the empty clause makes the formula UNSAT
+EMPTY_CLAUSE_EXAMPLE = [[1, -2], [], [3, 4, -5, 6]]
+
+
+def _random_cnf(num_clauses, seed):
+    """Clauses of 1 to NUM_VARS distinct variables with random signs."""
+    rng = random.Random(seed)
+    return [[v if rng.random() < 0.5 else -v
+             for v in rng.sample(range(1, NUM_VARS + 1), rng.randint(1, NUM_VARS))]
+            for _ in range(num_clauses)]
+
+
+def _formulas(count=40):
+    for seed in range(count):
+        yield _random_cnf(8 + seed % 12, seed)
+
+
+def _check_reduction(original, num_vars, total_vars, reduced, meta=None):
+    assert all(len(clause) == 3 for clause in reduced)
+    expected = solve_sat_bruteforce(original, num_vars)
+    model = solve_sat_cdcl(reduced, total_vars)   # too many auxiliaries for brute force
+    assert (model is None) == (expected is None)
+    if model is not None:
+        assert verify_projection_preserves_satisfiability(original, reduced, model,
+                                                          num_vars, meta)
+
+
+@pytest.mark.parametrize("formula", list(_formulas()) + [EMPTY_CLAUSE_EXAMPLE])
+def test_sat_3sat(formula):
+    total_vars, reduced = sat_3sat(formula, NUM_VARS + 1)
+    _check_reduction(formula, NUM_VARS, total_vars, reduced)
+
+
+@pytest.mark.parametrize("formula", list(_formulas()) + [EMPTY_CLAUSE_EXAMPLE])
+def test_sat_3sat_optimized(formula):
+    total_vars, reduced, meta = sat_3sat_optimized(formula, NUM_VARS)
+    _check_reduction(formula, NUM_VARS, total_vars, reduced, meta)
+    model = solve_sat_cdcl(reduced, total_vars)
+    if model is not None:
+        assert verify_sat(formula, project_assignment(model, NUM_VARS, meta))
+
+
+@pytest.mark.parametrize("header", [True, False])
+@pytest.mark.parametrize("formula", list(_formulas(10)) + [HEADERLESS_EXAMPLE,
+                                                           EMPTY_CLAUSE_EXAMPLE])
+def test_sat_3sat_file(tmp_path, formula, header):
+    source, target = tmp_path / "in.cnf", tmp_path / "out.cnf"
+    if header:
+        write_dimacs(str(source), NUM_VARS, formula)
+    else:
+        source.write_text("".join(" ".join(map(str, clause)) + " 0\n" for clause in formula))
+    sat_3sat_file(str(source), str(target))
+    total_vars, reduced = dimacs_reader(str(target))
+    _check_reduction(formula, NUM_VARS, total_vars, reduced)
@@ -0,0 +1,127 @@
+"""
+Subset-sum solvers checked against brute force over every index subset
+"""
+import random
+from collections import Counter
+
+import pytest
+
+import subsetsum_digits
+from subsetsum import (dp_subset_sum_mask, dp_subset_sum_one, iter_subsets,
+                       mask_to_subset, subsets)
+from subsetsum_count import count_solutions, sample_solutions
+from subsetsum_digits import solve_digits
+from subsetsum_mitm import iter_mitm_solutions, mitm_count, mitm_find_one
+from subsetsum_parallel import parallel_find_one
+
+
+def _instances(count=40):
+    rng = random.Random(2025)
+    for k in range(count):
+        n = rng.randint(0, 12)
+        # small weights: many solutions and repeated values
+        nums = [rng.randint(0, 6 if k % 2 else 40) for _ in range(n)]
+        target = rng.randint(0, sum(nums) + 2)
+        yield nums, target
+
+
+INSTANCES = list(_instances())
+
+
+def _mask_sum(nums, mask):
+    return sum(num for i, num in enumerate(nums) if mask >> i & 1)
+
+
+def _solutions(nums, target):
+    """Bitmasks of every index subset summing to target."""
+    return [mask for mask in range(1 << len(nums)) if _mask_sum(nums, mask) == target]
+
+
+def _check_find_one(nums, target, mask):
+    expected = _solutions(nums, target)
+    if expected:
+        assert mask in expected
+    else:
+        assert mask is None
+
+
+@pytest.mark.parametrize("nums, target", INSTANCES)
+def test_dp_subset_sum_one(nums, target):
+    subset = dp_subset_sum_one(nums, target)
+    if target and _solutions(nums, target):
+        assert sum(subset) == target
+        assert not Counter(subset) - Counter(nums)
+    else:
+        # [] also stands for the empty subset of target 0
+        assert subset == []
+
+
+@pytest.mark.parametrize("nums, target", INSTANCES)
+def test_dp_subset_sum_mask(nums, target):
+    _check_find_one(nums, target, dp_subset_sum_mask(nums, target))
+
+
+@pytest.mark.parametrize("low_memory", [False, True])
+@pytest.mark.parametrize("nums, target", INSTANCES)
+def test_mitm(nums, target, low_memory):
+    expected = _solutions(nums, target)
+    assert mitm_count(nums, target, low_memory) == len(expected)
+    assert sorted(iter_mitm_solutions(nums, target, low_memory)) == expected
+    _check_find_one(nums, target, mitm_find_one(nums, target, low_memory))
+
+
+def _values(nums, masks):
+    return sorted(tuple(sorted(mask_to_subset(nums, mask))) for mask in masks)
+
+
+@pytest.mark.parametrize("nums, target", INSTANCES)
+def test_iter_subsets(nums, target):
+    expected = _solutions(nums, target)
+    assert sorted(iter_subsets(nums, target)) == expected
+    distinct = list(iter_subsets(nums, target, distinct=True))
+    assert set(distinct) <= set(expected)
+    # exactly one mask per multiset of values
+    assert _values(nums, distinct) == sorted(set(_values(nums, expected)))
+    assert sorted(tuple(sorted(subset)) for subset in subsets(nums, target)) == \
+        _values(nums, expected)
+
+
+@pytest.mark.parametrize("nums, target", INSTANCES)
+def test_count_solutions(nums, target):
+    assert count_solutions(nums, target) == len(_solutions(nums, target))
+
+
+@pytest.mark.parametrize("nums, target", INSTANCES[:10])
+def test_samples_are_solutions(nums, target):
+    expected = _solutions(nums, target)
+    samples = sample_solutions(nums, target, 5, seed=1)
+    assert len(samples) == (5 if expected else 0)
+    assert set(samples) <= set(expected)
+
+
+@pytest.mark.parametrize("nums, target", INSTANCES[:6])
+def test_parallel_find_one(nums, target):
+    _check_find_one(nums, target, parallel_find_one(nums, target, 2))
+
+
+@pytest.mark.parametrize("nums, target", INSTANCES)
+def test_solve_digits(nums, target):
+    _check_find_one(nums, target, solve_digits(nums, target))
+
+
+@pytest.mark.parametrize("base", [2, 3, 4, 10])
+@pytest.mark.parametrize("nums, target", INSTANCES[:20])
+def test_solve_digits_with_carries(monkeypatch, nums, target, base):
+    # take the carry-bounded column search instead of the generic solvers
+    monkeypatch.setattr(subsetsum_digits, "MITM_MAX_ITEMS", -1)
+    monkeypatch.setattr(subsetsum_digits, "DP_MAX_TARGET", -1)
+    _check_find_one(nums, target, solve_digits(nums, target, base))
+
+
+def test_solve_digits_proves_unsat_past_the_generic_solvers():
+    # > 44 items and target > 2**26, columns that can carry, but the lowest
+    # base-4 digit of a subset sum can only be 0, 3 or 2
+    rng = random.Random(5)
+    nums = [rng.getrandbits(60) << 2 for _ in range(58)]
+    nums += [rng.getrandbits(60) << 2 | 3 for _ in range(2)]
+    assert solve_digits(nums, sum(nums[::2]) & ~3 | 1, base=4) is None
@@ -0,0 +1,60 @@
+"""
+SubsetSumIndex checked against the counting DP
+"""
+import random
+
+import pytest
+
+import subsetsum_index
+from subsetsum import mask_to_subset
+from subsetsum_count import count_solutions
+from subsetsum_index import SubsetSumIndex
+
+
+def _instances(count=20):
+    rng = random.Random(2026)
+    for k in range(count):
+        n = rng.randint(0, 12)
+        nums = [rng.randint(0, 6 if k % 2 else 40) for _ in range(n)]
+        yield nums, rng.randint(0, sum(nums) + 2)
+
+
+@pytest.mark.parametrize("nums, target", list(_instances()))
+def test_index_matches_count(nums, target):
+    index = SubsetSumIndex(nums, target)
+    for t in range(target + 1):
+        count = count_solutions(nums, t)
+        assert index.count(t) == count
+        assert index.reachable(t) == bool(count)
+        witness = index.one_witness(t)
+        assert (witness is not None) == bool(count)
+        if witness is not None:
+            assert sum(mask_to_subset(nums, witness)) == t
+
+
+def test_save_load_and_add_weight(tmp_path):
+    nums = [3, 5, 5, 8, 13]
+    path = str(tmp_path / "index.ssx")
+    SubsetSumIndex(nums, 30).save(path)
+    loaded = SubsetSumIndex.load(path)
+    assert [loaded.count(t) for t in range(31)] == [count_solutions(nums, t) for t in range(31)]
+    loaded.add_weight(7)
+    assert [loaded.count(t) for t in range(31)] == \
+        [count_solutions(nums + [7], t) for t in range(31)]
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+@pytest.mark.parametrize("n", [63, 64, 65, 127, 128, 129])
+def test_index_counts_past_64_bits(monkeypatch, tmp_path, n, numpy):
+    if not numpy:
+        monkeypatch.setattr(subsetsum_index, "np", None)
+    zeros = SubsetSumIndex([0] * n, 5)
+    assert zeros.count(0) == 2 ** n
+    mixed = SubsetSumIndex([0] * (n - 2) + [1, 2], 3)
+    assert [mixed.count(t) for t in range(4)] == [2 ** (n - 2)] * 4
+    path = str(tmp_path / "index.ssx")
+    mixed.save(path)
+    loaded = SubsetSumIndex.load(path)
+    assert [loaded.count(t) for t in range(4)] == [2 ** (n - 2)] * 4
+    loaded.add_weight(0)
+    assert loaded.count(3) == 2 ** (n - 1)
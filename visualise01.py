@@ -4,6 +4,23 @@ import time
 import plotly.express as px
 from read_write_files import *
 from subsetsum import *
+from subsetsum_verify import known_solution_keys, verify_solutions
+from dashboard_jobs import ALGORITHMS, JobManager
+
+MAX_TABLE_ROWS = 1000  # rows shown in the results table
+REFRESH_SECONDS = 0.5  # page refresh period while jobs are running
+
+
+# --- Shared state across reruns ---
+@st.cache_resource
+def job_manager():
+    return JobManager(workers=2)
+
+
+@st.cache_data
+def cached_instance(instance_id):
+    return load_instance(instance_id)
+
 
 # --- UI Configuration ---
 st.set_page_config(page_title="SUBSETSUM Analyzer - M1 MIV", layout="wide")
@@ -25,84 +42,139 @@ st.write("Analysis of Backtracking vs. Official Benchmarks")
 # --- Sidebar Controls ---
 with st.sidebar:
     st.header("Parameters")
-    instance_id = st.selectbox("Select Benchmark Instance", 
-                               options=[f"p{str(i).zfill(2)}" for i in range(1, 21)], 
-                               index=3) 
+    instance_ids = st.multiselect("Select Benchmark Instances",
+                                  options=[f"p{str(i).zfill(2)}" for i in range(1, 21)],
+                                  default=["p04"])
+    algorithms = st.multiselect("Algorithms", options=list(ALGORITHMS),
+                                default=["backtracking", "dp"])
+    rerun = st.checkbox("Ignore cached results")
     run_button = st.button("🚀 Run Analysis", type="primary")
 
-# --- Logic & Processing ---
+manager = job_manager()
+
+# --- Submit jobs (they run in background processes) ---
 if run_button:
-    with st.spinner(f'Fetching and solving {instance_id}...'):
-        # 1. Load Data
-        nums, target, known_solutions_01 = load_instance(instance_id)
-        
-        # 2. Solve Backtracking & Time
-        
-        start_time = time.perf_counter()
-        found_subsets = subsets(nums, target)
-        end_time = time.perf_counter()
-        bt_time = end_time - start_time
-
-        # 3. Solve DP (one solution) & Time
-        dp_start = time.perf_counter()
-        # Ensure your Solution class in backtracking.py has this method
-        dp_solution = dp_subset_sum_one(nums, target)
-        dp_end = time.perf_counter()
-        dp_time = dp_end - dp_start
-
-        # --- Dashboard Metrics ---
-        col1, col2, col3, col4, col5 = st.columns(5)
-        col1.metric("Target Sum (T)", target)
-        col2.metric("Set Size (n)", len(nums))
-        col3.metric("Solutions Found", len(found_subsets))
-        col4.metric("Backtracking Time", f"{bt_time:.4f}s")
-        col5.metric("DP Time (one sol)", f"{dp_time:.4f}s")
+    for instance_id in instance_ids:
+        nums, target, _ = cached_instance(instance_id)
+        for algorithm in algorithms:
+            manager.submit(instance_id, algorithm, nums, target, rerun=rerun)
 
+jobs = list(manager.jobs.values())
+
+if not jobs:
+    st.info("Select instances and algorithms and click 'Run Analysis'.")
+else:
+    # --- Jobs overview ---
+    st.write("### Jobs")
+    df_jobs = pd.DataFrame([{
+        "Job": job.id,
+        "Instance": job.instance,
+        "Algorithm": job.algorithm,
+        "Status": job.status,
+        "Solutions Found": job.found,
+        "Nodes Explored": job.nodes,
+        "Time (s)": round(job.elapsed, 4),
+    } for job in reversed(jobs)])
+    st.dataframe(df_jobs, use_container_width=True, hide_index=True)
+
+    active = manager.active_jobs()
+    if active:
+        cancel_cols = st.columns(min(len(active), 4))
+        for k, job in enumerate(active):
+            if cancel_cols[k % 4].button(f"⛔ Cancel #{job.id} {job.instance}/{job.algorithm}",
+                                         key=f"cancel-{job.id}"):
+                manager.cancel(job.id)
+
+    # --- Comparison chart over finished jobs ---
+    finished = [job for job in jobs if job.status == "done"]
+    if finished:
+        fig = px.bar(
+            pd.DataFrame([{"Instance": job.instance, "Algorithm": job.algorithm,
+                           "Time": job.elapsed} for job in finished]),
+            x="Instance", y="Time", color="Algorithm", barmode="group",
+            labels={'Time': 'Execution Time (Seconds)'},
+            title="Performance Comparison"
+        )
+        st.plotly_chart(fig)
+
+    # --- Details of one job ---
+    by_id = {job.id: job for job in jobs}
+    selected = st.selectbox(
+        "Show results of", options=list(reversed(by_id)),
+        format_func=lambda job_id: f"#{job_id} {by_id[job_id].instance} / "
+                                   f"{by_id[job_id].algorithm} ({by_id[job_id].status})")
+    job = by_id[selected]
+    nums, target, known_solutions_01 = cached_instance(job.instance)
+    official = known_solution_keys(known_solutions_01, len(nums))
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Target Sum (T)", target)
+    col2.metric("Set Size (n)", len(nums))
+    col3.metric("Solutions Found", job.result if job.algorithm == "count" else job.found)
+    col4.metric("Time", f"{job.elapsed:.4f}s")
+    if job.error:
+        st.error(job.error)
+    if job.stats:
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Nodes Explored", job.stats["nodes"])
+        col2.metric("Branches Pruned", sum(job.stats["prunes"].values()))
+        col3.metric("DP Cells", job.stats["dp_cells"])
+        col4.metric("Peak Table", f"{job.stats['peak_table_bytes'] / 1024:.1f} KiB")
+
+    st.write(f"### Results for Instance: `{job.instance}` ({job.algorithm})")
+    if job.algorithm == "backtracking":
         # --- Results Table Preparation ---
+        found_masks = list(job.solutions)[:MAX_TABLE_ROWS]
+        report = verify_solutions(nums, target, found_masks, known_solutions_01)
         rows = []
-        
-        for subset in found_subsets:
-            binary_list = subset_to_binary(nums, subset)
-            binary_str = "".join(str(b) for b in binary_list)
-            is_official = binary_str in known_solutions_01
-            
+
+        for i, mask in enumerate(found_masks):
+            subset = mask_to_subset(nums, mask)
+            binary_str = mask_to_bitstring(mask, len(nums))
+            is_official = binary_str in official
+
             rows.append({
                 "Subset": str(subset),
                 "Binary Vector": binary_str,
-                "Sum": sum(subset),
-                "Valid?": "✅" if sum(subset) == target else "❌",
+                "Sum": report.invalid.get(i, target),
+                "Valid?": "❌" if i in report.invalid else "✅",
                 "Official?": "🌟 Yes" if is_official else "⚠️ Extra"
             })
 
         df_found = pd.DataFrame(rows)
 
         # --- Display Table ---
-        st.write(f"### Results for Instance: `{instance_id}`")
+        if job.found > len(found_masks):
+            st.caption(f"Showing the first {len(found_masks)} solutions "
+                       f"out of {job.found}.")
+        elif job.status == "done":
+            st.caption(report.summary())
+            if report.missing:
+                st.warning(f"{len(report.missing)} official solution(s) not found: "
+                           + ", ".join(report.missing[:10]))
         if not df_found.empty:
             st.dataframe(df_found, use_container_width=True)
-        else:
+        elif not job.active:
             st.warning("No solutions found.")
 
-        # --- DP solution display ---
-        st.write("### DP (one solution)")
-        if dp_solution:
-            dp_binary = subset_to_binary(nums, dp_solution)
-            dp_bits = "".join(str(b) for b in dp_binary)
-            st.write(f"Values: {dp_solution}")
-            st.write(f"Binary: {dp_bits}")
-            st.write("Matches official? " + ("✅ Yes" if dp_bits in known_solutions_01 else "⚠️ No"))
-        else:
-            st.warning("DP found no solution.")
-
-        # --- FIXED Plotly Chart ---
-        # Fixed the variable mismatch: used bt_time and dp_time instead of the missing exec_time
-        fig = px.bar(
-            x=["Backtracking", "Dynamic Programming"], 
-            y=[bt_time, dp_time], 
-            labels={'x': 'Algorithm', 'y': 'Execution Time (Seconds)'}, 
-            title="Performance Comparison: Backtracking vs DP"
-        )
-        st.plotly_chart(fig)
+    elif job.algorithm in ("dp", "mitm"):
+        # --- One-solution display ---
+        mask = job.result
+        if mask is not None:
+            bits = mask_to_bitstring(mask, len(nums))
+            st.write(f"Values: {mask_to_subset(nums, mask)}")
+            st.write(f"Binary: {bits}")
+            st.write("Matches official? " + ("✅ Yes" if bits in official else "⚠️ No"))
+        elif job.status == "done":
+            st.warning(f"{job.algorithm} found no solution.")
 
-else:
-    st.info("Select an instance and click 'Run Analysis'.")
\ No newline at end of file
+    elif job.status == "done":
+        st.write(f"Number of solutions (DP count): {job.result}")
+
+    if job.active:
+        st.info(f"{job.algorithm} is {job.status}...")
+
+    # --- Keep polling while jobs are running ---
+    if manager.active_jobs():
+        time.sleep(REFRESH_SECONDS)
+        st.rerun()